@@ -0,0 +1,1279 @@
+import json
+import logging
+import math
+import multiprocessing
+import os
+import random
+import struct
+import time
+from logging.handlers import RotatingFileHandler
+from multiprocessing import shared_memory
+from typing import Tuple, Optional
+
+from wind_chess_batch import HAS_NUMPY, BATCH_MIN_MOVES, evaluate_moves
+from wind_chess_engine import WindDirection, WindGameState, other_player, wind_transitions
+from wind_chess_profile import profiled
+
+# 胜负分数，远大于任何局面评估；减去层数使AI优先选择更快的胜利
+WIN_SCORE = 1000000
+
+# 难度对应的搜索预算：最大深度、每步思考时间（秒）、节点上限
+# 时间都控制在GUI落子前1.5秒的等待之内
+DIFFICULTY_BUDGETS = {
+    "easy": {"max_depth": 1, "time_limit": 0.2, "node_limit": 20000},
+    "medium": {"max_depth": 6, "time_limit": 0.6, "node_limit": 300000},
+    "hard": {"max_depth": 64, "time_limit": 1.2, "node_limit": 2000000}
+}
+
+# 搜索模式：alphabeta假设风向保持不变；expectimax用机会节点按真实概率展开风向变化；
+# mcts用蒙特卡洛树搜索，随机对局中按规则抽取风向
+SEARCH_MODES = ("alphabeta", "expectimax", "mcts")
+
+# UCT探索常数
+UCT_EXPLORATION = 1.4
+
+# 随机对局的最大步数，超过后按和棋计分
+PLAYOUT_MAX_MOVES = 120
+
+# 机会节点从这个深度开始做Star2试探
+STAR2_PROBE_DEPTH = 3
+
+# 后台思考时只分析对手最可能的几步回应
+PONDER_MAX_REPLIES = 6
+
+# 命中后台思考的结果时，剩余的搜索只用这部分时间
+PONDER_HIT_TIME_FACTOR = 0.25
+
+# 移动排序的优先级：置换表移动、立即取胜、堵住对手的两连、杀手移动，其余按历史分数
+ORDER_HASH = 1 << 40
+ORDER_WIN = 1 << 39
+ORDER_BLOCK = 1 << 38
+ORDER_KILLER = 1 << 37
+
+# 每层保存的杀手移动数，以及杀手表覆盖的最大层数
+KILLER_SLOTS = 2
+MAX_PLY = 128
+
+# 置换表条目的边界类型
+TT_EXACT = 0
+TT_LOWER = 1
+TT_UPPER = 2
+
+# 每个置换表条目在Python中大约占用的内存（字节），用于按内存上限计算桶数
+TT_ENTRY_BYTES = 200
+
+# 共享置换表：每个槽3个64位字（校验字、分数、深度/边界/代数/移动），表头保留8个字
+SHARED_TT_SLOT_WORDS = 3
+SHARED_TT_HEADER_WORDS = 8
+
+# 主要变例最多取出的步数
+PV_MAX_LENGTH = 16
+
+# 每步搜索统计的日志：按大小轮换，保留几个旧文件
+SEARCH_LOG_FILE = "wind_chess_search.log"
+SEARCH_LOG_MAX_BYTES = 1 << 20
+SEARCH_LOG_BACKUPS = 3
+
+search_logger = logging.getLogger("wind_chess.search")
+
+def enable_search_log(path: str = SEARCH_LOG_FILE, max_bytes: int = SEARCH_LOG_MAX_BYTES, backup_count: int = SEARCH_LOG_BACKUPS):
+    """把每步的搜索统计以JSON行写入轮换日志文件，重复调用同一路径不会重复添加"""
+    path = os.path.abspath(path)
+    for handler in search_logger.handlers:
+        if isinstance(handler, RotatingFileHandler) and handler.baseFilename == path:
+            return handler
+    handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    search_logger.addHandler(handler)
+    search_logger.setLevel(logging.INFO)
+    search_logger.propagate = False
+    return handler
+
+class TranspositionTable:
+    """固定大小的置换表
+
+    每个桶有两个槽：深度优先槽只被更深或更新一代的结果替换，
+    被挤出的条目和其余结果放进总是替换槽。每次搜索开始时代数加一，
+    上一回合留下的条目在深度优先槽中也可以被覆盖。
+    条目为 (哈希, 深度, 分数, 边界类型, 最佳移动, 代数)。
+    """
+
+    def __init__(self, memory_mb: float = 16):
+        buckets = max(1, int(memory_mb * 1024 * 1024) // (2 * TT_ENTRY_BYTES))
+        # 桶数取2的幂，用位与代替取模
+        buckets = 1 << (buckets.bit_length() - 1)
+        self.mask = buckets - 1
+        self.depth_slots = [None] * buckets
+        self.always_slots = [None] * buckets
+        self.generation = 0
+
+        self.probes = 0
+        self.hits = 0
+
+    def new_search(self):
+        """开始新的搜索，旧条目的代数随之变旧"""
+        self.generation = (self.generation + 1) & 0xFF
+        self.probes = 0
+        self.hits = 0
+
+    def clear(self):
+        """清空置换表"""
+        for i in range(len(self.depth_slots)):
+            self.depth_slots[i] = None
+            self.always_slots[i] = None
+
+    def probe(self, key: int):
+        """查找条目，没有时返回None"""
+        self.probes += 1
+        index = key & self.mask
+        entry = self.depth_slots[index]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        entry = self.always_slots[index]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        return None
+
+    def store(self, key: int, depth: int, score, flag: int, best_move):
+        """保存搜索结果"""
+        index = key & self.mask
+        entry = (key, depth, score, flag, best_move, self.generation)
+        current = self.depth_slots[index]
+        if current is None or current[0] == key or depth >= current[1] or current[5] != self.generation:
+            if current is not None and current[0] != key:
+                self.always_slots[index] = current
+            self.depth_slots[index] = entry
+        else:
+            self.always_slots[index] = entry
+
+_SCORE_STRUCT = struct.Struct("<d")
+_WORD_STRUCT = struct.Struct("<Q")
+
+def _pack_score(score) -> int:
+    """分数按float64的位模式存成一个字"""
+    return _WORD_STRUCT.unpack(_SCORE_STRUCT.pack(score))[0]
+
+def _unpack_score(word: int):
+    score = _SCORE_STRUCT.unpack(_WORD_STRUCT.pack(word))[0]
+    return int(score) if score.is_integer() else score
+
+class SharedFlag:
+    """放在共享内存里的停止标志，接口与threading.Event相同"""
+
+    def __init__(self, words, index):
+        self.words = words
+        self.index = index
+
+    def set(self):
+        self.words[self.index] = 1
+
+    def clear(self):
+        self.words[self.index] = 0
+
+    def is_set(self) -> bool:
+        return self.words[self.index] != 0
+
+# 当前进程已经连接的共享置换表，按名字复用
+_ATTACHED_TABLES = {}
+
+def _attach_shared_tt(name, buckets):
+    """在子进程中按名字连接主进程创建的共享置换表"""
+    table = _ATTACHED_TABLES.get(name)
+    if table is None:
+        table = _ATTACHED_TABLES[name] = SharedTranspositionTable(name=name, buckets=buckets)
+    return table
+
+class SharedTranspositionTable:
+    """放在multiprocessing.shared_memory里的置换表，供Lazy SMP的多个进程共用
+
+    接口和替换策略与TranspositionTable相同。写入不加锁：每个槽保存
+    哈希^数据1^数据2作为校验字，读到被并发写坏的槽时校验失败，当作未命中。
+    """
+
+    def __init__(self, memory_mb: float = 16, name: Optional[str] = None, buckets: Optional[int] = None):
+        if name is None:
+            buckets = max(1, int(memory_mb * 1024 * 1024) // (2 * SHARED_TT_SLOT_WORDS * 8))
+            buckets = 1 << (buckets.bit_length() - 1)
+            size = (SHARED_TT_HEADER_WORDS + buckets * 2 * SHARED_TT_SLOT_WORDS) * 8
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.buckets = buckets
+        self.mask = buckets - 1
+        self.words = self.shm.buf.cast("Q")
+        self.stop_flag = SharedFlag(self.words, 0)
+        self.generation = 0
+
+        self.probes = 0
+        self.hits = 0
+
+    def __reduce__(self):
+        # 传给子进程时只传名字，由子进程重新连接
+        return (_attach_shared_tt, (self.shm.name, self.buckets))
+
+    def new_search(self):
+        """开始新的搜索，旧条目的代数随之变旧"""
+        self.generation = (self.generation + 1) & 0xFF
+        self.probes = 0
+        self.hits = 0
+
+    def clear(self):
+        """清空置换表"""
+        words = self.words
+        for i in range(SHARED_TT_HEADER_WORDS, len(words)):
+            words[i] = 0
+
+    def close(self):
+        """断开共享内存，创建者同时释放它"""
+        if self.words is None:
+            return
+        self.words.release()
+        self.words = None
+        self.stop_flag = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __del__(self):
+        try:
+            self.close()
+        except:
+            pass
+
+    def _read(self, offset):
+        """读取一个槽，返回(哈希, 深度, 分数, 边界类型, 最佳移动, 代数)，空槽或损坏时返回None"""
+        words = self.words
+        data = words[offset + 2]
+        if not data & (1 << 39):
+            return None
+        score_word = words[offset + 1]
+        key = words[offset] ^ score_word ^ data
+        move = None
+        if data & (1 << 18):
+            move = (((data >> 19) & 0x1F, (data >> 24) & 0x1F), ((data >> 29) & 0x1F, (data >> 34) & 0x1F))
+        return (key, data & 0xFF, _unpack_score(score_word), (data >> 8) & 0x3, move, (data >> 10) & 0xFF)
+
+    def _write(self, offset, key, depth, score, flag, best_move, generation):
+        data = (1 << 39) | (min(max(depth, 0), 0xFF)) | (flag << 8) | (generation << 10)
+        if best_move is not None:
+            (from_x, from_y), (to_x, to_y) = best_move
+            data |= (1 << 18) | (from_x << 19) | (from_y << 24) | (to_x << 29) | (to_y << 34)
+        score_word = _pack_score(score)
+        words = self.words
+        words[offset] = key ^ score_word ^ data
+        words[offset + 1] = score_word
+        words[offset + 2] = data
+
+    def probe(self, key: int):
+        """查找条目，没有时返回None"""
+        self.probes += 1
+        offset = SHARED_TT_HEADER_WORDS + (key & self.mask) * 2 * SHARED_TT_SLOT_WORDS
+        for slot in (offset, offset + SHARED_TT_SLOT_WORDS):
+            entry = self._read(slot)
+            if entry is not None and entry[0] == key:
+                self.hits += 1
+                return entry
+        return None
+
+    def store(self, key: int, depth: int, score, flag: int, best_move):
+        """保存搜索结果"""
+        offset = SHARED_TT_HEADER_WORDS + (key & self.mask) * 2 * SHARED_TT_SLOT_WORDS
+        always = offset + SHARED_TT_SLOT_WORDS
+        current = self._read(offset)
+        if current is None or current[0] == key or depth >= current[1] or current[5] != self.generation:
+            if current is not None and current[0] != key:
+                self._write(always, *current)
+            self._write(offset, key, depth, score, flag, best_move, self.generation)
+        else:
+            self._write(always, key, depth, score, flag, best_move, self.generation)
+
+class SearchTimeout(Exception):
+    """搜索超出时间或节点预算"""
+
+def _move_to_list(move):
+    return [list(move[0]), list(move[1])] if move else None
+
+def _format_move(move) -> str:
+    (from_x, from_y), (to_x, to_y) = move
+    return f"({from_x},{from_y})->({to_x},{to_y})"
+
+class SearchStats:
+    """单次搜索的统计信息"""
+
+    def __init__(self):
+        self.nodes = 0
+        self.depth = 0
+        self.score = 0
+        self.best_move = None
+        self.elapsed = 0.0
+        # 有效分支因子：最后完成的一轮与上一轮的节点数之比
+        self.branching_factor = 0.0
+        # 搜索的局面和设置，find_best_move结束时填写
+        self.board_size = None
+        self.difficulty = None
+        self.search_mode = None
+        self.ponder_hit = False
+        # 置换表查询次数和命中次数
+        self.tt_probes = 0
+        self.tt_hits = 0
+        # beta截断次数，以及其中由第一个移动引起的次数（衡量移动排序）
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        # 迭代加深的每一轮：(深度, 节点数, 耗时, 是否完成)
+        self.iterations = []
+        # 主要变例：从置换表中沿最佳移动取出
+        self.pv = []
+
+    @property
+    def completed_depth(self) -> int:
+        """本次搜索实际完成的最深一轮（不含后台思考带来的深度）"""
+        return max((depth for depth, _, _, completed in self.iterations if completed), default=0)
+
+    @property
+    def tt_hit_rate(self) -> float:
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+
+    @property
+    def first_move_cutoff_rate(self) -> float:
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        """转换为可写入JSON的字典"""
+        return {
+            "board_size": self.board_size,
+            "difficulty": self.difficulty,
+            "search_mode": self.search_mode,
+            "best_move": _move_to_list(self.best_move),
+            "score": self.score,
+            "depth": self.depth,
+            "nodes": self.nodes,
+            "elapsed": round(self.elapsed, 6),
+            "nodes_per_second": round(self.nodes_per_second, 1),
+            "branching_factor": round(self.branching_factor, 3),
+            "tt_probes": self.tt_probes,
+            "tt_hit_rate": round(self.tt_hit_rate, 4),
+            "cutoffs": self.cutoffs,
+            "first_move_cutoff_rate": round(self.first_move_cutoff_rate, 4),
+            "ponder_hit": self.ponder_hit,
+            "iterations": [
+                {"depth": depth, "nodes": nodes, "seconds": round(seconds, 6), "completed": completed}
+                for depth, nodes, seconds, completed in self.iterations
+            ],
+            "pv": [_move_to_list(move) for move in self.pv]
+        }
+
+    def summary(self) -> str:
+        """多行的可读摘要，用于调试面板"""
+        lines = [
+            f"深度 {self.depth}  节点 {self.nodes}",
+            f"用时 {self.elapsed:.3f} 秒  {self.nodes_per_second:.0f} 节点/秒"
+        ]
+        if self.tt_probes:
+            lines.append(f"置换表命中 {self.tt_hit_rate:.1%}  首步截断 {self.first_move_cutoff_rate:.1%}")
+        if self.ponder_hit:
+            lines.append("命中后台思考")
+        for depth, nodes, seconds, completed in self.iterations:
+            mark = "" if completed else "（中断）"
+            lines.append(f"  第{depth}层 {nodes} 节点 {seconds:.3f} 秒{mark}")
+        if self.pv:
+            lines.append("主要变例 " + " ".join(_format_move(move) for move in self.pv))
+        return "\n".join(lines)
+
+class MCTSNode:
+    """蒙特卡洛树节点，wins以走到该节点的一方为视角"""
+
+    __slots__ = ("children", "visits", "wins")
+
+    def __init__(self):
+        self.children = {}
+        self.visits = 0
+        self.wins = 0.0
+
+def _playout(state, rng, max_moves) -> Optional[object]:
+    """随机对局到分出胜负，能一步取胜时直接取胜；返回胜者，超过步数返回None"""
+    size = state.board_size_value
+    for _ in range(max_moves):
+        if state.winner is not None:
+            break
+        moves = state.legal_moves()
+        if not moves:
+            break
+
+        player = state.current_player
+        chosen = None
+        for (from_x, from_y), (to_x, to_y) in moves:
+            if state.bits.is_winning_move(player, from_y * size + from_x, to_y * size + to_x):
+                chosen = ((from_x, from_y), (to_x, to_y))
+                break
+        if chosen is None:
+            chosen = moves[rng.randrange(len(moves))]
+        state.apply_move(chosen[0], chosen[1])
+
+    return state.winner
+
+def run_mcts(state: WindGameState, time_limit: float, max_iterations: int, seed: int, root_moves=None, exploration: float = UCT_EXPLORATION, stop_event=None):
+    """在state的副本上运行UCT，返回根节点各移动的 {移动: (访问次数, 胜场)}
+
+    树是开环的：节点只记录移动序列，每次迭代都按规则重新抽取风向，
+    所以每个节点上只在当前风向下合法的子节点中做UCT选择。
+    给出root_moves时根节点只扩展和选择其中的移动（战术检查限定的候选）。
+    stop_event被设置时提前结束（仅限同一进程内）。
+    """
+    state = state.copy()
+    state.rng = random.Random(seed)
+    rng = random.Random(seed ^ 0x5DEECE66D)
+    root = MCTSNode()
+    root_set = set(root_moves) if root_moves else None
+    root_length = len(state.history)
+    deadline = time.perf_counter() + time_limit
+
+    iterations = 0
+    while iterations < max_iterations and time.perf_counter() < deadline:
+        if stop_event is not None and stop_event.is_set():
+            break
+        iterations += 1
+        node = root
+        path = [root]
+
+        # 选择和扩展
+        while state.winner is None:
+            moves = state.legal_moves()
+            if node is root and root_set is not None:
+                moves = [move for move in moves if move in root_set]
+            if not moves:
+                break
+            untried = [move for move in moves if move not in node.children]
+            if untried:
+                move = untried[rng.randrange(len(untried))]
+                child = node.children[move] = MCTSNode()
+                state.apply_move(move[0], move[1])
+                path.append(child)
+                break
+
+            log_visits = math.log(node.visits)
+            best_value = -1.0
+            for move in moves:
+                child = node.children[move]
+                value = child.wins / child.visits + exploration * math.sqrt(log_visits / child.visits)
+                if value > best_value:
+                    best_value = value
+                    best_move = move
+            node = node.children[best_move]
+            state.apply_move(best_move[0], best_move[1])
+            path.append(node)
+
+        # 模拟
+        movers = [entry[2] for entry in state.history[root_length:]]
+        winner = _playout(state, rng, PLAYOUT_MAX_MOVES)
+
+        # 回传：子节点的胜场以走到该节点的一方为视角
+        root.visits += 1
+        for child, mover in zip(path[1:], movers):
+            child.visits += 1
+            if winner is None:
+                child.wins += 0.5
+            elif winner == mover:
+                child.wins += 1.0
+
+        while len(state.history) > root_length:
+            state.undo_move()
+
+    return {move: (child.visits, child.wins) for move, child in root.children.items()}
+
+def _mcts_worker(args):
+    """进程池中的MCTS任务"""
+    return run_mcts(*args)
+
+# 每个子进程复用的Lazy SMP辅助AI
+_SMP_HELPERS = {}
+
+def _smp_worker(args):
+    """进程池中的Lazy SMP辅助搜索，返回(根局面哈希, 节点数, 完成的深度, 分数, 最佳移动)"""
+    difficulty, search_mode, tt, state, root_moves, helper_id, generation = args
+    ai = _SMP_HELPERS.get((difficulty, search_mode))
+    if ai is None:
+        ai = _SMP_HELPERS[(difficulty, search_mode)] = WindGameAI(difficulty, search_mode, tt_memory_mb=0)
+    ai.tt = tt
+    tt.generation = generation
+    ai._stop_event = tt.stop_flag
+    key = state.key
+    ai.search(state, root_moves, helper_id=helper_id)
+    stats = ai.last_stats
+    return key, stats.nodes, stats.completed_depth, stats.score, stats.best_move
+
+class WindGameAI:
+    """智能AI对手"""
+
+    def __init__(self, difficulty: str = "medium", search_mode: str = "alphabeta", tt_memory_mb: float = 16, mcts_workers: Optional[int] = None, smp_workers: int = 1):
+        self.difficulty = difficulty
+        self.search_mode = search_mode if search_mode in SEARCH_MODES else "alphabeta"
+        # MCTS的根并行进程数，默认每个CPU核心一个
+        self.mcts_workers = mcts_workers if mcts_workers is not None else (os.cpu_count() or 1)
+        # alpha-beta/期望搜索的Lazy SMP进程数（包括主进程），1表示单线程搜索
+        self.smp_workers = max(1, smp_workers)
+        self._pool = None
+        self._stop_event = None
+        # 置换表在回合之间保留，复用之前的搜索结果；Lazy SMP时放在共享内存中
+        if self.smp_workers > 1 and self.search_mode != "mcts":
+            self.tt = SharedTranspositionTable(tt_memory_mb)
+        else:
+            self.tt = TranspositionTable(tt_memory_mb)
+        self.budget = DIFFICULTY_BUDGETS.get(difficulty, DIFFICULTY_BUDGETS["medium"])
+        self.last_stats = SearchStats()
+        # 后台思考的结果：{局面键: (完成的深度, 分数, 最佳移动)}
+        self.ponder_results = {}
+        self.last_ponder_hit = False
+
+        # 移动排序用的杀手移动（每层）和历史分数
+        self._killers = [[None] * KILLER_SLOTS for _ in range(MAX_PLY)]
+        self._history = {}
+
+        # 当前搜索的计数和截止条件
+        self._nodes = 0
+        self._deadline = 0.0
+        self._node_limit = 0
+        self._tt_probes = 0
+        self._tt_hits = 0
+        self._cutoffs = 0
+        self._first_cutoffs = 0
+
+    def evaluate_board(self, board, board_size, player, wind_direction) -> float:
+        """评估棋盘状态"""
+        score = 0
+        center = board_size // 2
+
+        player_pieces = sum(1 for row in board for cell in row if cell == player)
+        opponent_pieces = sum(1 for row in board for cell in row if cell is not None and cell != player)
+        score += (player_pieces - opponent_pieces) * 10
+
+        if board[center][center] == player:
+            score += 30
+
+        score += self._evaluate_lines(board, board_size, player) * 15
+        score += self._evaluate_mobility(board, board_size, player, wind_direction) * 5
+
+        return score
+
+    def _evaluate_lines(self, board, board_size, player) -> int:
+        """评估连线潜力"""
+        lines = 0
+        center = board_size // 2
+
+        for y in range(board_size):
+            for x in range(board_size):
+                if board[y][x] == player:
+                    distance_to_center = abs(x - center) + abs(y - center)
+                    lines += (board_size - distance_to_center) * 2
+
+        return lines
+
+    def _evaluate_mobility(self, board, board_size, player, wind_direction) -> int:
+        """评估移动灵活性"""
+        mobility = 0
+        center = board_size // 2
+
+        for y in range(board_size):
+            for x in range(board_size):
+                if board[y][x] == player:
+                    if (x, y) == (center, center):
+                        mobility += 8
+                    elif wind_direction == WindDirection.HORIZONTAL:
+                        mobility += 2
+                    elif wind_direction == WindDirection.VERTICAL:
+                        mobility += 2
+                    elif wind_direction == WindDirection.DIAGONAL:
+                        mobility += 4
+
+        return mobility
+
+    @profiled()
+    def find_best_move(self, state: WindGameState, stop_event=None) -> Optional[Tuple[Tuple[int, int], Tuple[int, int]]]:
+        """寻找最佳移动
+
+        候选移动直接在state上执行和撤销，不复制棋盘；返回时state保持原样。
+        stop_event（threading.Event）被设置时搜索尽快结束并返回目前的最佳移动，
+        用于在后台线程中思考时取消搜索。
+        这一步的统计保存在last_stats中，并写入搜索日志（见enable_search_log）。
+        """
+        self._stop_event = stop_event
+        self.last_ponder_hit = False
+        self.last_stats = SearchStats()
+        start_time = time.perf_counter()
+        best_move = self._select_move(state)
+        self._finish_stats(state, best_move, time.perf_counter() - start_time)
+        return best_move
+
+    def _select_move(self, state):
+        """战术检查后按难度和搜索模式选择移动"""
+        all_moves = state.legal_moves()
+
+        if not all_moves:
+            return None
+
+        # 战术检查：能直接取胜或只有一步能堵住对手时不必搜索
+        winning = self._winning_moves(state, all_moves)
+        if winning:
+            return self._forced_move(winning[0])
+        blocks = self._blocking_moves(state, all_moves)
+        if blocks:
+            if len(blocks) == 1:
+                return self._forced_move(blocks[0])
+            all_moves = blocks
+
+        if self.difficulty == "easy":
+            return self._find_easy_move(state, all_moves)
+
+        if self.search_mode == "mcts":
+            return self.search_mcts(state, all_moves)
+
+        if self.smp_workers > 1:
+            return self.search_smp(state, all_moves)
+
+        return self.search(state, all_moves)
+
+    def _finish_stats(self, state, best_move, elapsed):
+        """补全这一步的统计（局面信息、总耗时、主要变例）并写入日志"""
+        stats = self.last_stats
+        stats.board_size = state.board_size_enum.name
+        stats.difficulty = self.difficulty
+        stats.search_mode = self.search_mode
+        stats.ponder_hit = self.last_ponder_hit
+        stats.best_move = best_move
+        stats.elapsed = elapsed
+        if best_move is not None:
+            if stats.depth > 1 and self.search_mode != "mcts":
+                stats.pv = self._principal_variation(state, best_move, stats.depth)
+            else:
+                stats.pv = [best_move]
+        if search_logger.isEnabledFor(logging.INFO):
+            search_logger.info(json.dumps(stats.to_dict(), ensure_ascii=False))
+
+    def _principal_variation(self, state, first_move, depth):
+        """从第一步开始沿置换表中的最佳移动取出主要变例，风向按最可能的变化"""
+        pv = [first_move]
+        history_length = len(state.history)
+        seen = {state.key}
+        move = first_move
+        while True:
+            state.apply_move(move[0], move[1], self._likely_next_wind(state))
+            if state.winner is not None or len(pv) >= min(depth, PV_MAX_LENGTH) or state.key in seen:
+                break
+            seen.add(state.key)
+            entry = self.tt.probe(state.key)
+            if entry is None or entry[4] not in state.legal_moves():
+                break
+            move = entry[4]
+            pv.append(move)
+        while len(state.history) > history_length:
+            state.undo_move()
+        return pv
+
+    def search_mcts(self, state: WindGameState, root_moves=None):
+        """根并行的MCTS：每个进程独立建树，合并根节点的访问次数后选访问最多的移动"""
+        if root_moves is None:
+            root_moves = state.legal_moves()
+        if not root_moves:
+            return None
+
+        start_time = time.perf_counter()
+        workers = max(1, self.mcts_workers)
+        iterations = max(1, self.budget["node_limit"] // workers)
+        base_seed = random.getrandbits(32)
+        tasks = [(state, self.budget["time_limit"], iterations, base_seed + i, list(root_moves)) for i in range(workers)]
+
+        if workers == 1:
+            results = [run_mcts(*tasks[0], stop_event=self._stop_event)]
+        else:
+            pending = self._get_pool(workers).map_async(_mcts_worker, tasks)
+            # 等待结果时仍然响应取消
+            while not pending.ready():
+                if self._stop_event is not None and self._stop_event.is_set():
+                    return root_moves[0]
+                pending.wait(0.05)
+            results = pending.get()
+
+        visits = {}
+        wins = {}
+        for result in results:
+            for move, (move_visits, move_wins) in result.items():
+                visits[move] = visits.get(move, 0) + move_visits
+                wins[move] = wins.get(move, 0.0) + move_wins
+
+        stats = SearchStats()
+        # 根节点只扩展了root_moves；时间太短时可能一个都没有访问到
+        best_move = max(visits, key=visits.get) if visits else root_moves[0]
+        best_visits = visits.get(best_move, 0)
+        stats.nodes = sum(visits.values())
+        stats.depth = 1
+        stats.score = wins.get(best_move, 0.0) / best_visits if best_visits else 0.0
+        stats.best_move = best_move
+        stats.elapsed = time.perf_counter() - start_time
+        self.last_stats = stats
+        return best_move
+
+    def _get_pool(self, workers):
+        """MCTS进程池在回合之间复用；用spawn启动，子进程不继承Tk状态"""
+        if self._pool is None:
+            self._pool = multiprocessing.get_context("spawn").Pool(workers)
+        return self._pool
+
+    def search_smp(self, state: WindGameState, root_moves=None):
+        """Lazy SMP：辅助进程以错开的深度搜索同一根节点，通过共享置换表交换结果
+
+        主进程照常做迭代加深，结束时通知辅助进程停止；
+        某个辅助进程完成了更深的一轮时采用它的结果。
+        """
+        if root_moves is None:
+            root_moves = state.legal_moves()
+        if not root_moves:
+            return None
+
+        start_time = time.perf_counter()
+        helpers = self.smp_workers - 1
+        self.tt.stop_flag.clear()
+        # 辅助进程使用主进程这次搜索的代数
+        generation = (self.tt.generation + 1) & 0xFF
+        # 任务由进程池的线程稍后才序列化，这时主搜索正在state上走子，所以传入副本
+        root = state.copy()
+        root_key = state.key
+        tasks = [(self.difficulty, self.search_mode, self.tt, root, list(root_moves), helper_id, generation) for helper_id in range(1, helpers + 1)]
+        pending = self._get_pool(helpers).map_async(_smp_worker, tasks, chunksize=1)
+
+        try:
+            best_move = self.search(state, root_moves)
+        finally:
+            self.tt.stop_flag.set()
+        results = pending.get()
+
+        stats = self.last_stats
+        depth_reached = max(stats.depth, stats.completed_depth)
+        for key, nodes, depth, score, move in results:
+            stats.nodes += nodes
+            # 只采用确实搜索了同一根局面、完成了更深一轮的辅助结果
+            if key == root_key and move in root_moves and depth > depth_reached:
+                depth_reached = depth
+                stats.depth = depth
+                stats.score = score
+                best_move = move
+        stats.best_move = best_move
+        stats.elapsed = time.perf_counter() - start_time
+        return best_move
+
+    def close(self):
+        """关闭后台进程和共享置换表，之后不应再使用这个AI"""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+        if isinstance(self.tt, SharedTranspositionTable):
+            self.tt.close()
+
+    def _winning_moves(self, state, moves):
+        """一步就能成线的移动，用连线表找出候选落点"""
+        bits = state.bits
+        player = state.current_player
+        wins = bits.line_threats(player)
+        if not wins:
+            return []
+        winning = []
+        for move in moves:
+            from_sq, to_sq = self._move_squares(state, move)
+            if wins >> to_sq & 1 and bits.is_winning_move(player, from_sq, to_sq):
+                winning.append(move)
+        return winning
+
+    def _blocking_moves(self, state, moves):
+        """对手在下一回合可能出现的任一风向下能一步取胜时，返回让对手在所有风向下都无法取胜的移动
+
+        没有威胁或堵不住时返回空列表，交给正常搜索。
+        """
+        bits = state.bits
+        player = state.current_player
+        opponent = other_player(player)
+        next_winds = {wind[0] for wind, _ in wind_transitions(state.wind_direction, state.wind_duration, state.max_wind_duration)}
+        paths = bits.winning_paths(opponent, next_winds)
+        if not paths:
+            return []
+
+        # 只有落在对手取胜路线上的移动才可能挡住，再逐个确认没有放出新的取胜路线
+        blocks = []
+        for move in moves:
+            from_sq, to_sq = self._move_squares(state, move)
+            if paths >> to_sq & 1 and not bits.moved(player, from_sq, to_sq).has_winning_move(opponent, next_winds):
+                blocks.append(move)
+        return blocks
+
+    def _forced_move(self, move):
+        """战术检查直接给出的移动，不经过搜索"""
+        self.last_stats.best_move = move
+        return move
+
+    def _move_squares(self, state, move):
+        """移动的起点和终点格子编号"""
+        size = state.board_size_value
+        (from_x, from_y), (to_x, to_y) = move
+        return from_y * size + from_x, to_y * size + to_x
+
+    def _find_easy_move(self, state, all_moves):
+        """简单难度：只看一步，并在前三名中随机选择"""
+        scored_moves = list(zip(self._static_scores(state, all_moves), all_moves))
+        self.last_stats.nodes = len(all_moves)
+        self.last_stats.depth = 1
+        scored_moves.sort(key=lambda x: x[0], reverse=True)
+        if len(scored_moves) > 3:
+            return scored_moves[random.randint(0, 2)][1]
+        else:
+            return scored_moves[0][1]
+
+    def _static_scores(self, state, moves) -> list:
+        """走出每个候选移动后行棋方的静态评估（风向不变），移动多时用NumPy批量计算"""
+        player = state.current_player
+        wind_direction = state.wind_direction
+        if HAS_NUMPY and len(moves) >= BATCH_MIN_MOVES:
+            return evaluate_moves(state, moves, player, wind_direction).tolist()
+
+        evaluator = state.evaluator
+        # 评估时沿用当前风向，整个搜索共用同一个风向元组
+        current_wind = (wind_direction, state.wind_duration)
+        scores = []
+        for move in moves:
+            state.apply_move(move[0], move[1], current_wind)
+            scores.append(evaluator.evaluate(player, wind_direction))
+            state.undo_move()
+        return scores
+
+    def search(self, state: WindGameState, root_moves=None, helper_id: int = 0):
+        """迭代加深的alpha-beta（negamax）搜索，在时间或节点预算用完时返回
+
+        helper_id大于0时作为Lazy SMP的辅助搜索：不开始新的一代，
+        奇数编号从第2层开始，并轮换根节点的移动顺序，与其他进程错开。
+        """
+        if root_moves is None:
+            root_moves = state.legal_moves()
+        if not root_moves:
+            return None
+        if helper_id:
+            shift = helper_id % len(root_moves)
+            root_moves = root_moves[shift:] + root_moves[:shift]
+
+        stats = SearchStats()
+        start_time = time.perf_counter()
+        time_limit = self.budget["time_limit"]
+        self._nodes = 0
+        self._node_limit = self.budget["node_limit"]
+        self._tt_probes = self._tt_hits = 0
+        self._cutoffs = self._first_cutoffs = 0
+        history_length = len(state.history)
+        if not helper_id:
+            self.tt.new_search()
+
+        best_move = root_moves[0]
+        entry = self.tt.probe(state.key)
+        if entry is not None and entry[4] in root_moves:
+            best_move = entry[4]
+
+        first_depth = 1 + (helper_id & 1)
+        # 后台思考已经分析过这个局面时，从下一层继续加深
+        pondered = self.ponder_results.get(state.key)
+        self.last_ponder_hit = pondered is not None and pondered[2] in root_moves
+        if self.last_ponder_hit:
+            stats.depth, stats.score, best_move = pondered
+            first_depth = stats.depth + 1
+            time_limit *= PONDER_HIT_TIME_FACTOR
+            if abs(stats.score) >= WIN_SCORE - 1000:
+                first_depth = self.budget["max_depth"] + 1
+        self.ponder_results = {}
+        self._deadline = start_time + time_limit
+
+        self._new_heuristics()
+        previous_nodes = 0
+        for depth in range(first_depth, self.budget["max_depth"] + 1):
+            # 上一轮的最佳移动最先搜索
+            ordered = self._order_moves(state, list(root_moves), best_move, 0)
+            iteration_start = self._nodes
+            iteration_time = time.perf_counter()
+            try:
+                score, move = self._search_root(state, ordered, depth)
+            except SearchTimeout:
+                # 撤销被中断的搜索留下的移动
+                while len(state.history) > history_length:
+                    state.undo_move()
+                stats.iterations.append((depth, self._nodes - iteration_start, time.perf_counter() - iteration_time, False))
+                break
+
+            best_move = move
+            stats.depth = depth
+            stats.score = score
+            iteration_nodes = self._nodes - iteration_start
+            stats.iterations.append((depth, iteration_nodes, time.perf_counter() - iteration_time, True))
+            if previous_nodes:
+                stats.branching_factor = iteration_nodes / previous_nodes
+            previous_nodes = iteration_nodes
+            if abs(score) >= WIN_SCORE - 1000:
+                break
+
+        stats.nodes = self._nodes
+        stats.tt_probes = self._tt_probes
+        stats.tt_hits = self._tt_hits
+        stats.cutoffs = self._cutoffs
+        stats.first_move_cutoffs = self._first_cutoffs
+        stats.best_move = best_move
+        stats.elapsed = time.perf_counter() - start_time
+        self.last_stats = stats
+        return best_move
+
+    def ponder(self, state: WindGameState, stop_event):
+        """对手思考时在后台分析其可能的回应，直到stop_event被设置
+
+        对对手最可能的几步回应和每种风向结果轮流加深搜索，结果记入
+        ponder_results，搜索树留在置换表中，轮到AI时直接复用。
+        state会被修改，调用方应传入副本。
+        """
+        self._stop_event = stop_event
+        self.ponder_results = {}
+        if self.difficulty == "easy" or self.search_mode == "mcts" or state.game_over:
+            return
+
+        positions = []
+        for move in self._likely_replies(state):
+            for wind, _ in wind_transitions(state.wind_direction, state.wind_duration, state.max_wind_duration):
+                positions.append((move, wind))
+
+        self._nodes = 0
+        self._deadline = math.inf
+        self._node_limit = math.inf
+        history_length = len(state.history)
+        self.tt.new_search()
+        self._new_heuristics()
+        results = self.ponder_results
+
+        try:
+            for depth in range(1, self.budget["max_depth"] + 1):
+                for move, wind in positions:
+                    state.apply_move(move[0], move[1], wind)
+                    if state.winner is None:
+                        moves = state.legal_moves()
+                        if moves:
+                            previous = results.get(state.key)
+                            if previous is not None and abs(previous[1]) >= WIN_SCORE - 1000:
+                                state.undo_move()
+                                continue
+                            moves = self._order_moves(state, moves, previous[2] if previous is not None else None, 0)
+                            score, best_move = self._search_root(state, moves, depth)
+                            results[state.key] = (depth, score, best_move)
+                    state.undo_move()
+        except SearchTimeout:
+            while len(state.history) > history_length:
+                state.undo_move()
+
+    def _likely_replies(self, state):
+        """按一层静态评估挑选行棋方最可能的几步"""
+        next_wind = self._likely_next_wind(state)
+        scored = []
+        for move in state.legal_moves():
+            state.apply_move(move[0], move[1], next_wind)
+            if state.winner is not None:
+                score = WIN_SCORE
+            else:
+                score = -self._evaluate_state(state)
+            state.undo_move()
+            scored.append((score, move))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [move for _, move in scored[:PONDER_MAX_REPLIES]]
+
+    def _search_root(self, state, moves, depth):
+        """搜索根节点，返回（分数，最佳移动）"""
+        alpha = -WIN_SCORE - 1
+        beta = WIN_SCORE + 1
+        best_score = -WIN_SCORE - 1
+        best_move = moves[0]
+        next_wind = self._likely_next_wind(state)
+
+        for move in moves:
+            if self.search_mode == "expectimax":
+                score = self._chance_node(state, move, depth, alpha, beta, 0)
+            else:
+                state.apply_move(move[0], move[1], next_wind)
+                if state.winner is not None:
+                    score = WIN_SCORE
+                else:
+                    score = -self._negamax(state, depth - 1, -beta, -alpha, 1)
+                state.undo_move()
+
+            if score > best_score:
+                best_score = score
+                best_move = move
+            if score > alpha:
+                alpha = score
+
+        self.tt.store(state.key, depth, self._score_to_tt(best_score, 0), TT_EXACT, best_move)
+        return best_score, best_move
+
+    def _negamax(self, state, depth, alpha, beta, ply):
+        """negamax形式的alpha-beta搜索，分数以当前行棋方为视角"""
+        self._nodes += 1
+        if self._nodes & 1023 == 0:
+            self._check_budget()
+
+        if depth <= 0:
+            return self._evaluate_state(state)
+
+        cutoff, hash_move = self._probe_tt(state, depth, alpha, beta, ply)
+        if cutoff is not None:
+            return cutoff
+
+        moves = state.legal_moves()
+        if not moves:
+            return self._evaluate_state(state)
+        moves = self._order_moves(state, moves, hash_move, ply)
+
+        original_alpha = alpha
+        next_wind = self._likely_next_wind(state)
+        best_score = -WIN_SCORE - 1
+        best_move = moves[0]
+        for index, move in enumerate(moves):
+            state.apply_move(move[0], move[1], next_wind)
+            if state.winner is not None:
+                score = WIN_SCORE - ply
+            else:
+                score = -self._negamax(state, depth - 1, -beta, -alpha, ply + 1)
+            state.undo_move()
+
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        self._record_cutoff(move, depth, ply, index)
+                        break
+
+        self._store_tt(state, depth, best_score, original_alpha, beta, best_move, ply)
+        return best_score
+
+    def _expectimax(self, state, depth, alpha, beta, ply):
+        """带机会节点的搜索中的行棋方节点"""
+        self._nodes += 1
+        if self._nodes & 1023 == 0:
+            self._check_budget()
+
+        if depth <= 0:
+            return self._evaluate_state(state)
+
+        cutoff, hash_move = self._probe_tt(state, depth, alpha, beta, ply)
+        if cutoff is not None:
+            return cutoff
+
+        moves = state.legal_moves()
+        if not moves:
+            return self._evaluate_state(state)
+        moves = self._order_moves(state, moves, hash_move, ply)
+
+        original_alpha = alpha
+        best_score = -WIN_SCORE - 1
+        best_move = moves[0]
+        for index, move in enumerate(moves):
+            score = self._chance_node(state, move, depth, alpha, beta, ply)
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        self._record_cutoff(move, depth, ply, index)
+                        break
+
+        self._store_tt(state, depth, best_score, original_alpha, beta, best_move, ply)
+        return best_score
+
+    def _chance_node(self, state, move, depth, alpha, beta, ply):
+        """走出move后按风向变化概率加权子局面，分数以走棋方为视角
+
+        先用Star2试探（每个子局面只搜对手的第一步）得到上界，
+        再用Star1根据已搜索部分和分数上下界收窄每个子局面的窗口。
+        """
+        from_pos, to_pos = move
+        outcomes = wind_transitions(state.wind_direction, state.wind_duration, state.max_wind_duration)
+
+        # 取胜的移动没有后续风向
+        state.apply_move(from_pos, to_pos, outcomes[0][0])
+        won = state.winner is not None
+        state.undo_move()
+        if won:
+            return WIN_SCORE - ply
+
+        if depth <= 1:
+            expected = 0.0
+            for wind, probability in outcomes:
+                self._nodes += 1
+                if self._nodes & 1023 == 0:
+                    self._check_budget()
+                state.apply_move(from_pos, to_pos, wind)
+                expected -= probability * self._evaluate_state(state)
+                state.undo_move()
+            return expected
+
+        lower = -WIN_SCORE
+        upper_bounds = [WIN_SCORE] * len(outcomes)
+
+        # Star2：对手任何一步的分数都是其局面分数的下界，即本方分数的上界
+        if depth >= STAR2_PROBE_DEPTH:
+            probed = 0.0
+            for i, (wind, probability) in enumerate(outcomes):
+                state.apply_move(from_pos, to_pos, wind)
+                replies = state.legal_moves()
+                if replies:
+                    # 优先试探置换表中的最佳应着
+                    entry = self.tt.probe(state.key)
+                    reply = entry[4] if entry is not None and entry[4] in replies else replies[0]
+                    reply_score = self._chance_node(state, reply, depth - 1, -WIN_SCORE - 1, WIN_SCORE + 1, ply + 1)
+                    upper_bounds[i] = min(WIN_SCORE, -reply_score)
+                state.undo_move()
+                probed += probability * upper_bounds[i]
+            if probed <= alpha:
+                return probed
+
+        # Star1
+        searched = 0.0
+        remaining_probability = 1.0
+        remaining_upper = sum(probability * upper_bounds[i] for i, (wind, probability) in enumerate(outcomes))
+        for i, (wind, probability) in enumerate(outcomes):
+            remaining_probability -= probability
+            remaining_upper -= probability * upper_bounds[i]
+
+            child_alpha = (alpha - searched - remaining_upper) / probability
+            child_beta = (beta - searched - lower * remaining_probability) / probability
+            window_alpha = max(child_alpha, -WIN_SCORE - 1)
+            window_beta = min(child_beta, WIN_SCORE + 1)
+
+            state.apply_move(from_pos, to_pos, wind)
+            score = -self._expectimax(state, depth - 1, -window_beta, -window_alpha, ply + 1)
+            state.undo_move()
+
+            searched += probability * score
+            if score <= child_alpha:
+                return searched + remaining_upper
+            if score >= child_beta:
+                return searched + lower * remaining_probability
+
+        return searched
+
+    def _probe_tt(self, state, depth, alpha, beta, ply):
+        """查询置换表，返回（可直接返回的分数或None，置换表中的最佳移动）"""
+        self._tt_probes += 1
+        entry = self.tt.probe(state.key)
+        if entry is None:
+            return None, None
+        self._tt_hits += 1
+
+        if entry[1] >= depth:
+            score = self._score_from_tt(entry[2], ply)
+            flag = entry[3]
+            if flag == TT_EXACT:
+                return score, entry[4]
+            if flag == TT_LOWER and score >= beta:
+                return score, entry[4]
+            if flag == TT_UPPER and score <= alpha:
+                return score, entry[4]
+
+        return None, entry[4]
+
+    def _store_tt(self, state, depth, score, alpha, beta, best_move, ply):
+        """按搜索窗口确定边界类型后写入置换表"""
+        if score <= alpha:
+            flag = TT_UPPER
+        elif score >= beta:
+            flag = TT_LOWER
+        else:
+            flag = TT_EXACT
+        self.tt.store(state.key, depth, self._score_to_tt(score, ply), flag, best_move)
+
+    def _score_to_tt(self, score, ply):
+        """胜负分数按到当前节点的距离保存，使其与所在层数无关"""
+        if score >= WIN_SCORE - 1000:
+            return score + ply
+        if score <= -WIN_SCORE + 1000:
+            return score - ply
+        return score
+
+    def _score_from_tt(self, score, ply):
+        """把置换表中的胜负分数换算回当前层数"""
+        if score >= WIN_SCORE - 1000:
+            return score - ply
+        if score <= -WIN_SCORE + 1000:
+            return score + ply
+        return score
+
+    def _order_moves(self, state, moves, hash_move, ply):
+        """按优先级排序：置换表移动、立即取胜、堵住对手的两连、杀手移动、历史分数"""
+        bits = state.bits
+        size = state.board_size_value
+        player = state.current_player
+        wins = bits.line_threats(player)
+        blocks = bits.line_threats(other_player(player))
+        killers = self._killers[ply] if ply < MAX_PLY else ()
+        history = self._history
+
+        scores = {}
+        for move in moves:
+            (from_x, from_y), (to_x, to_y) = move
+            to_sq = to_y * size + to_x
+            if move == hash_move:
+                scores[move] = ORDER_HASH
+            elif wins >> to_sq & 1 and bits.is_winning_move(player, from_y * size + from_x, to_sq):
+                scores[move] = ORDER_WIN
+            elif blocks >> to_sq & 1:
+                scores[move] = ORDER_BLOCK
+            elif move in killers:
+                scores[move] = ORDER_KILLER
+            else:
+                scores[move] = history.get(move, 0)
+        moves.sort(key=scores.__getitem__, reverse=True)
+        return moves
+
+    def _record_cutoff(self, move, depth, ply, index):
+        """引起beta截断的移动记为杀手移动并增加历史分数，index是它在排序后的位置"""
+        self._cutoffs += 1
+        if index == 0:
+            self._first_cutoffs += 1
+        if ply < MAX_PLY:
+            killers = self._killers[ply]
+            if killers[0] != move:
+                killers[1:] = killers[:-1]
+                killers[0] = move
+        self._history[move] = self._history.get(move, 0) + depth * depth
+
+    def _new_heuristics(self):
+        """新的搜索清空杀手移动，历史分数减半，保留一部分以前的经验"""
+        for killers in self._killers:
+            for i in range(KILLER_SLOTS):
+                killers[i] = None
+        self._history = {move: score >> 1 for move, score in self._history.items() if score > 1}
+
+    def _check_budget(self):
+        """预算用完或搜索被取消时中断搜索"""
+        if self._nodes >= self._node_limit or time.perf_counter() >= self._deadline:
+            raise SearchTimeout()
+        if self._stop_event is not None and self._stop_event.is_set():
+            raise SearchTimeout()
+
+    @profiled()
+    def _evaluate_state(self, state) -> int:
+        """以当前行棋方为视角的静态评估"""
+        player = state.current_player
+        wind_direction = state.wind_direction
+        evaluator = state.evaluator
+        return evaluator.evaluate(player, wind_direction) - evaluator.evaluate(other_player(player), wind_direction)
+
+    def _likely_next_wind(self, state):
+        """最可能的下一个风向：未到最大持续回合时保持当前风向"""
+        if state.wind_duration < state.max_wind_duration:
+            return (state.wind_direction, state.wind_duration + 1)
+        return (state.wind_direction, 1)
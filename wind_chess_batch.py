@@ -0,0 +1,338 @@
+from typing import List, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from wind_chess_engine import (ALL_DIRECTIONS, LINE_DIRECTIONS, MAX_WIND_DURATION, WIND_DIRECTIONS, WIND_KEEP_PROBABILITY,
+                               BoardSize, Player, WindDirection, WindGameState,
+                               get_bitboard_masks, splitmix64)
+
+# NumPy是可选依赖，没有安装时AI退回逐个评估
+HAS_NUMPY = np is not None
+
+# 棋盘数组用int8表示：0为空格，1为玩家A的棋子，2为玩家B的棋子
+EMPTY = 0
+PIECE_CODES = {Player.A: 1, Player.B: 2}
+
+# 批量对局中风向用下标表示
+WIND_ORDER = tuple(WindDirection)
+
+# 候选移动少于这个数时逐个评估更快
+BATCH_MIN_MOVES = 8
+
+_WEIGHT_MATRICES = {}
+
+def distance_weight_matrix(size: int):
+    """每个格子的连线潜力权重 (size - 到风眼的曼哈顿距离) * 2，按尺寸缓存"""
+    matrix = _WEIGHT_MATRICES.get(size)
+    if matrix is None:
+        weights = get_bitboard_masks(size).square_weights
+        matrix = np.array(weights, dtype=np.int64).reshape(size, size)
+        matrix.flags.writeable = False
+        _WEIGHT_MATRICES[size] = matrix
+    return matrix
+
+def state_to_array(state: WindGameState):
+    """把局面转换为 (size, size) 的int8数组"""
+    size = state.board_size_value
+    squares = size * size
+    nbytes = (squares + 7) // 8
+    board = np.zeros(squares, dtype=np.int8)
+    for player, code in PIECE_CODES.items():
+        # 位棋盘的第sq位对应数组的第sq个格子
+        raw = np.frombuffer(state.bits.pieces(player).to_bytes(nbytes, "little"), dtype=np.uint8)
+        board[np.unpackbits(raw, bitorder="little")[:squares].astype(bool)] = code
+    return board.reshape(size, size)
+
+def build_move_boards(state: WindGameState, moves: List[Tuple[Tuple[int, int], Tuple[int, int]]]):
+    """当前行棋方走出每个候选移动后的全部棋盘，形状为 (移动数, size, size)"""
+    board = state_to_array(state)
+    boards = np.repeat(board[np.newaxis], len(moves), axis=0)
+    index = np.arange(len(moves))
+    moves_array = np.array(moves, dtype=np.intp).reshape(len(moves), 4)
+    from_x, from_y, to_x, to_y = moves_array.T
+    boards[index, from_y, from_x] = EMPTY
+    boards[index, to_y, to_x] = PIECE_CODES[state.current_player]
+    return boards
+
+def batch_evaluate(boards, player, wind_direction):
+    """对一批棋盘做与WindGameAI.evaluate_board相同的评估，返回int64数组"""
+    size = boards.shape[-1]
+    center = size // 2
+    own = boards == PIECE_CODES[player]
+    opponent = (boards != EMPTY) & ~own
+
+    player_pieces = own.sum(axis=(1, 2), dtype=np.int64)
+    opponent_pieces = opponent.sum(axis=(1, 2), dtype=np.int64)
+    on_center = own[:, center, center].astype(np.int64)
+    lines = (own * distance_weight_matrix(size)).sum(axis=(1, 2))
+    per_piece = 4 if wind_direction == WindDirection.DIAGONAL else 2
+
+    return ((player_pieces - opponent_pieces) * 10 + on_center * 30 + lines * 15
+            + (on_center * 8 + (player_pieces - on_center) * per_piece) * 5)
+
+def evaluate_moves(state: WindGameState, moves, player=None, wind_direction=None):
+    """走出每个候选移动后以player为视角的评估（默认当前行棋方和当前风向）"""
+    if player is None:
+        player = state.current_player
+    if wind_direction is None:
+        wind_direction = state.wind_direction
+    return batch_evaluate(build_move_boards(state, moves), player, wind_direction)
+
+def batch_check_win(boards, player):
+    """对一批 (N, size, size) 棋盘做与WindGameState.check_win相同的判断，返回布尔数组
+
+    每个方向把棋盘平移0、1、2格后逐格相乘，三个都是本方棋子的位置就是一条连线；
+    整条落在本方底线上的横线不算（底线上最多一个棋子）。
+    """
+    size = boards.shape[-1]
+    own = (boards == PIECE_CODES[player]).astype(np.int8)
+    home_row = 0 if player == Player.A else size - 1
+    found = np.zeros(boards.shape[0], dtype=bool)
+
+    for dx, dy in LINE_DIRECTIONS:
+        # 连线起点的范围：三个格子都在棋盘内
+        x_start, x_stop = (2, size) if dx < 0 else (0, size - 2 * dx)
+        y_stop = size - 2 * dy
+        product = np.ones((boards.shape[0], y_stop, x_stop - x_start), dtype=np.int8)
+        for i in range(3):
+            product *= own[:, i * dy:y_stop + i * dy, x_start + i * dx:x_stop + i * dx]
+        if dy == 0:
+            product[:, home_row] = 0
+        found |= product.any(axis=(1, 2))
+    return found
+
+def batch_winners(boards):
+    """每个棋盘的胜者编码（0表示没有连线）；双方都有连线时记为玩家A"""
+    winners = np.zeros(boards.shape[0], dtype=np.int8)
+    for player in (Player.B, Player.A):
+        winners[batch_check_win(boards, player)] = PIECE_CODES[player]
+    return winners
+
+class BatchWindGame:
+    """用NumPy数组同时进行N局风之棋，用于自我对弈生成数据和调参
+
+    boards为 (N, size, size) 的int8棋盘，wind为WIND_ORDER中的下标，duration为风已持续的回合，
+    side为行棋方的棋子编码，winner为胜者的棋子编码（0表示未结束）。
+    每局有自己的SplitMix64随机数状态，同样的种子总是得到同样的对局。
+    移动用格子编号 y*size + x 表示。
+    """
+
+    def __init__(self, board_size: BoardSize, num_games: int, seed: int = 0):
+        if not HAS_NUMPY:
+            raise ImportError("BatchWindGame需要安装NumPy")
+
+        self.board_size_enum = board_size
+        self.size = size = board_size.value[0]
+        self.num_games = num_games
+        self.max_wind_duration = MAX_WIND_DURATION
+        squares = size * size
+        masks = get_bitboard_masks(size)
+
+        # 初始棋盘与WindGameState相同
+        self._initial_board = state_to_array(WindGameState(board_size, WindDirection.HORIZONTAL)).reshape(squares)
+
+        # 每个方向走k步后的格子，出界时为squares（指向补在末尾的一个永远非空的哨兵格子）
+        self._targets = np.full((len(ALL_DIRECTIONS), size, squares), squares, dtype=np.intp)
+        for d, (dx, dy) in enumerate(ALL_DIRECTIONS):
+            for sq in range(squares):
+                x, y = sq % size, sq // size
+                for k in range(1, size):
+                    nx, ny = x + k * dx, y + k * dy
+                    if not (0 <= nx < size and 0 <= ny < size):
+                        break
+                    self._targets[d, k, sq] = ny * size + nx
+
+        # 各风向允许的方向；风眼上的棋子可以向任意方向移动
+        self._wind_allows = np.array([[direction in WIND_DIRECTIONS[wind] for direction in ALL_DIRECTIONS] for wind in WIND_ORDER])
+        self._is_center = np.zeros(squares, dtype=bool)
+        self._is_center[masks.center_sq] = True
+
+        # 经过每个格子的连线（已排除底线），按棋子编码-1索引；不足的位置用哨兵格子补齐
+        most_lines = max(len(lines) for player in Player for lines in masks.lines[player])
+        self._line_table = np.full((2, squares, most_lines, 3), squares, dtype=np.intp)
+        for player, code in PIECE_CODES.items():
+            for sq in range(squares):
+                for i, mask in enumerate(masks.lines[player][sq]):
+                    self._line_table[code - 1, sq, i] = [bit for bit in range(squares) if mask >> bit & 1]
+
+        generator = splitmix64(seed)
+        self.rng_state = np.array([next(generator) for _ in range(num_games)], dtype=np.uint64)
+
+        self.boards = np.zeros((num_games, size, size), dtype=np.int8)
+        self.wind = np.zeros(num_games, dtype=np.int8)
+        self.duration = np.zeros(num_games, dtype=np.int8)
+        self.side = np.zeros(num_games, dtype=np.int8)
+        self.winner = np.zeros(num_games, dtype=np.int8)
+        self.move_count = np.zeros(num_games, dtype=np.int32)
+        self.reset()
+
+    @property
+    def done(self):
+        """已分出胜负的对局"""
+        return self.winner != 0
+
+    def reset(self, games=None):
+        """重新开始指定的对局（布尔掩码或下标，默认全部），随机抽取初始风向"""
+        if games is None:
+            index = np.arange(self.num_games)
+        else:
+            games = np.asarray(games)
+            index = np.flatnonzero(games) if games.dtype == bool else games
+        self.boards.reshape(self.num_games, -1)[index] = self._initial_board
+        self.wind[index] = self._random_below(index, len(WIND_ORDER))
+        self.duration[index] = 1
+        self.side[index] = PIECE_CODES[Player.A]
+        self.winner[index] = 0
+        self.move_count[index] = 0
+
+    def load(self, boards, side, wind, duration=None):
+        """换成给定的一批局面（对局数随之改变），用于分析和走法生成测试"""
+        boards = np.asarray(boards, dtype=np.int8)
+        num_games = boards.shape[0]
+        if num_games != self.num_games:
+            generator = splitmix64(int(self.rng_state[0]) if self.num_games else 0)
+            self.rng_state = np.array([next(generator) for _ in range(num_games)], dtype=np.uint64)
+            self.num_games = num_games
+        self.boards = boards.copy()
+        self.side = np.broadcast_to(np.asarray(side, dtype=np.int8), (num_games,)).copy()
+        self.wind = np.broadcast_to(np.asarray(wind, dtype=np.int8), (num_games,)).copy()
+        self.duration = np.ones(num_games, dtype=np.int8) if duration is None else np.broadcast_to(np.asarray(duration, dtype=np.int8), (num_games,)).copy()
+        self.winner = batch_winners(self.boards)
+        self.move_count = np.zeros(num_games, dtype=np.int32)
+
+    def _next_random(self, index):
+        """推进指定对局的SplitMix64状态，返回64位随机数"""
+        state = self.rng_state[index] + np.uint64(0x9E3779B97F4A7C15)
+        self.rng_state[index] = state
+        z = (state ^ (state >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return z ^ (z >> np.uint64(31))
+
+    def _random_float(self, index):
+        """[0, 1) 的均匀随机数"""
+        return (self._next_random(index) >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+    def _random_below(self, index, n):
+        """[0, n) 的均匀随机整数"""
+        return np.minimum((self._random_float(index) * n).astype(np.int64), n - 1)
+
+    def legal_move_mask(self):
+        """全部对局的合法移动，形状为 (N, 格子数, 格子数)，[局, 起点, 终点]"""
+        squares = self.size * self.size
+        games, origins, targets = self.legal_move_arrays()
+        mask = np.zeros((self.num_games, squares, squares), dtype=bool)
+        mask[games, origins, targets] = True
+        return mask
+
+    def legal_move_arrays(self):
+        """全部合法移动的 (局, 起点, 终点) 数组，按这个顺序排序
+
+        按方向一步步平移：起点到第k步的格子之间全部为空时，第k步的格子是合法落点。
+        每局只有几个棋子，所以只跟踪仍在前进的 (局, 起点)，不做整盘运算。
+        """
+        num_games = self.num_games
+        squares = self.size * self.size
+        flat = self.boards.reshape(num_games, squares)
+        empty = np.zeros((num_games, squares + 1), dtype=bool)
+        empty[:, :squares] = flat == 0
+        own = (flat == self.side[:, np.newaxis]) & (self.winner == 0)[:, np.newaxis]
+        allows = self._wind_allows[self.wind]
+
+        found = []
+        for d in range(len(ALL_DIRECTIONS)):
+            games, origins = np.nonzero(own & (allows[:, d, np.newaxis] | self._is_center))
+            for k in range(1, self.size):
+                targets = self._targets[d, k, origins]
+                clear = empty[games, targets]
+                games, origins, targets = games[clear], origins[clear], targets[clear]
+                if not len(games):
+                    break
+                found.append((games, origins, targets))
+
+        if not found:
+            nothing = np.zeros(0, dtype=np.intp)
+            return nothing, nothing, nothing
+        games, origins, targets = (np.concatenate(parts) for parts in zip(*found))
+        order = np.argsort((games * squares + origins) * squares + targets)
+        return games[order], origins[order], targets[order]
+
+    def sample_moves(self, mask=None):
+        """为每局均匀随机选一个合法移动，返回 (起点, 终点) 数组；没有合法移动的对局为-1"""
+        if mask is None:
+            games, origins, targets = self.legal_move_arrays()
+        else:
+            games, origins, targets = np.nonzero(mask)
+        counts = np.bincount(games, minlength=self.num_games)
+        starts = np.cumsum(counts) - counts
+        pick = (self._random_float(np.arange(self.num_games)) * counts).astype(np.int64)
+        playable = counts > 0
+        chosen = np.where(playable, starts + pick, 0)
+
+        from_sq = np.full(self.num_games, -1, dtype=np.intp)
+        to_sq = np.full(self.num_games, -1, dtype=np.intp)
+        from_sq[playable] = origins[chosen[playable]]
+        to_sq[playable] = targets[chosen[playable]]
+        return from_sq, to_sq
+
+    def step(self, from_sq, to_sq):
+        """每局走一步（起点为负数或已结束的对局不动），返回胜者数组
+
+        移动必须合法。走完后只检查经过落点的连线，未分胜负的对局交换行棋方并按规则变化风向。
+        """
+        from_sq = np.asarray(from_sq)
+        to_sq = np.asarray(to_sq)
+        index = np.flatnonzero((from_sq >= 0) & (self.winner == 0))
+        flat = self.boards.reshape(self.num_games, -1)
+        side = self.side[index]
+        flat[index, from_sq[index]] = 0
+        flat[index, to_sq[index]] = side
+        self.move_count[index] += 1
+
+        won = self._wins_through(index, to_sq[index])
+        self.winner[index[won]] = side[won]
+
+        playing = index[~won]
+        self.side[playing] = 3 - self.side[playing]
+        self._change_wind(playing)
+        return self.winner.copy()
+
+    def _wins_through(self, index, to_sq):
+        """指定对局中行棋方是否有经过to_sq的连线"""
+        squares = self.size * self.size
+        padded = np.zeros((len(index), squares + 1), dtype=np.int8)
+        padded[:, :squares] = self.boards.reshape(self.num_games, squares)[index]
+        side = self.side[index]
+        lines = self._line_table[side - 1, to_sq]
+        cells = padded[np.arange(len(index))[:, np.newaxis, np.newaxis], lines]
+        return (cells == side[:, np.newaxis, np.newaxis]).all(axis=2).any(axis=1)
+
+    def _change_wind(self, index):
+        """与WindGameState.change_wind相同的风向变化：未到最大回合时有70%的概率保持"""
+        keep = (self.duration[index] < self.max_wind_duration) & (self._random_float(index) < WIND_KEEP_PROBABILITY)
+        kept = index[keep]
+        self.duration[kept] += 1
+        rerolled = index[~keep]
+        self.wind[rerolled] = self._random_below(rerolled, len(WIND_ORDER))
+        self.duration[rerolled] = 1
+
+    def check_win(self):
+        """按整盘棋判断每局的胜者编码，直接修改了boards之后可以用它重新确定胜负"""
+        return batch_winners(self.boards)
+
+    def to_state(self, game: int) -> WindGameState:
+        """把一局转换为WindGameState（不含悔棋记录），便于和标量引擎对照"""
+        state = WindGameState(self.board_size_enum)
+        size = self.size
+        codes = {code: player for player, code in PIECE_CODES.items()}
+        board = self.boards[game]
+        state.load_position(
+            [[codes.get(int(board[y, x])) for x in range(size)] for y in range(size)],
+            codes[int(self.side[game])],
+            WIND_ORDER[self.wind[game]],
+            int(self.duration[game])
+        )
+        state.move_count = int(self.move_count[game])
+        return state
@@ -0,0 +1,680 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from wind_chess_ai import DIFFICULTY_BUDGETS, WindGameAI
+from wind_chess_engine import (ALL_DIRECTIONS, LINE_DIRECTIONS, WIND_DIRECTIONS, BoardSize, IncrementalEvaluator, Player, WindDirection,
+                               WindGameState, iter_bits)
+from wind_chess_batch import HAS_NUMPY, PIECE_CODES, WIND_ORDER
+from wind_chess_profile import PROFILE_ENABLED, start_session, strip_profile_args
+
+if HAS_NUMPY:
+    import numpy as np
+    from wind_chess_batch import BatchWindGame, batch_check_win, batch_evaluate, batch_winners, evaluate_moves, state_to_array
+
+# perft的参考结果：从初始局面开始，每层依次枚举三种风向和该风向下的全部移动。
+# 第N层的每个移动算一个叶子；在此之前就取胜的移动结束对局，不计数。
+PERFT_REFERENCE = {
+    BoardSize.SMALL: [29, 769, 23572, 673961, 20134748],
+    BoardSize.MEDIUM: [93, 8295, 808586],
+    BoardSize.LARGE: [240, 56166, 14026028]
+}
+
+# 不指定深度时运行的层数，几秒内完成；更深的参考值用 --depth 检查
+PERFT_DEFAULT_DEPTH = {
+    BoardSize.SMALL: 4,
+    BoardSize.MEDIUM: 3,
+    BoardSize.LARGE: 2
+}
+
+# 向量化perft每批展开的局面数，限制内存占用
+PERFT_CHUNK = 4096
+
+def _list_moves(state: WindGameState):
+    """原始的逐格扫描走法生成：在二维列表棋盘上沿风向逐格前进"""
+    size = state.board_size_value
+    center = size // 2
+    player = state.current_player
+    moves = []
+    for y in range(size):
+        for x in range(size):
+            if state.board[y][x] != player:
+                continue
+            if (x, y) == (center, center):
+                directions = ALL_DIRECTIONS
+            else:
+                directions = WIND_DIRECTIONS[state.wind_direction]
+            for dx, dy in directions:
+                nx, ny = x + dx, y + dy
+                while 0 <= nx < size and 0 <= ny < size and state.board[ny][nx] is None:
+                    moves.append(((x, y), (nx, ny)))
+                    nx, ny = nx + dx, ny + dy
+    return moves
+
+def _ray_moves(state: WindGameState):
+    """引擎的走法生成：预计算射线表加占用位"""
+    return state.legal_moves()
+
+def _bitboard_moves(state: WindGameState):
+    """位棋盘的走法生成：BitBoard.move_targets移位填充"""
+    size = state.board_size_value
+    bits = state.bits
+    moves = []
+    for sq in iter_bits(bits.pieces(state.current_player)):
+        from_pos = (sq % size, sq // size)
+        for to_sq in iter_bits(bits.move_targets(sq, state.wind_direction)):
+            moves.append((from_pos, (to_sq % size, to_sq // size)))
+    return moves
+
+MOVE_GENERATORS = {
+    "list": _list_moves,
+    "rays": _ray_moves,
+    "bitboard": _bitboard_moves
+}
+
+def perft(state: WindGameState, depth: int, generate=_ray_moves) -> int:
+    """数出depth层的叶子数，每层枚举全部风向"""
+    if depth <= 0:
+        return 1
+    nodes = 0
+    for wind_direction in WindDirection:
+        state.set_wind(wind_direction, 1)
+        for from_pos, to_pos in generate(state):
+            if depth == 1:
+                nodes += 1
+                continue
+            state.apply_move(from_pos, to_pos, (wind_direction, 1))
+            if state.winner is None:
+                nodes += perft(state, depth - 1, generate)
+            state.undo_move()
+    return nodes
+
+def perft_vectorized(board_size: BoardSize, depth: int) -> int:
+    """用BatchWindGame逐层展开整批局面的perft"""
+    state = WindGameState(board_size, WindDirection.HORIZONTAL)
+    env = BatchWindGame(board_size, 1)
+    return _perft_batch(env, state_to_array(state)[np.newaxis], Player.A, depth)
+
+def _perft_batch(env, boards, player, depth):
+    """一批同一方行棋的局面的perft之和，分块展开"""
+    squares = env.size * env.size
+    code = PIECE_CODES[player]
+    opponent = Player.B if player == Player.A else Player.A
+    nodes = 0
+    for start in range(0, len(boards), PERFT_CHUNK):
+        chunk = boards[start:start + PERFT_CHUNK]
+        for wind_index in range(len(WIND_ORDER)):
+            env.load(chunk, code, wind_index)
+            games, origins, targets = env.legal_move_arrays()
+            if depth == 1:
+                nodes += len(games)
+                continue
+            for move_start in range(0, len(games), PERFT_CHUNK):
+                part = slice(move_start, move_start + PERFT_CHUNK)
+                children = chunk[games[part]].reshape(-1, squares).copy()
+                rows = np.arange(len(children))
+                children[rows, origins[part]] = 0
+                children[rows, targets[part]] = code
+                children = children.reshape(-1, env.size, env.size)
+                children = children[~batch_check_win(children, player)]
+                if len(children):
+                    nodes += _perft_batch(env, children, opponent, depth - 1)
+    return nodes
+
+def run_perft(board_size: BoardSize, depth: int, generators: List[str]) -> bool:
+    """对指定棋盘逐层运行perft，打印节点数、速度和与参考值的比较，全部一致时返回True"""
+    reference = PERFT_REFERENCE.get(board_size, [])
+    ok = True
+    print(f"perft {board_size.value[3]}")
+    for name in generators:
+        for d in range(1, depth + 1):
+            start = time.perf_counter()
+            if name == "vectorized":
+                nodes = perft_vectorized(board_size, d)
+            else:
+                nodes = perft(WindGameState(board_size, WindDirection.HORIZONTAL), d, MOVE_GENERATORS[name])
+            elapsed = time.perf_counter() - start
+
+            expected = reference[d - 1] if d <= len(reference) else None
+            if expected is None:
+                verdict = "无参考值"
+            elif nodes == expected:
+                verdict = "一致"
+            else:
+                verdict = f"不一致（参考值 {expected}）"
+                ok = False
+            nps = nodes / elapsed if elapsed > 0 else 0.0
+            print(f"  {name:<10} 深度 {d}: {nodes:>10} 节点  {elapsed:8.3f} 秒  {nps:12.0f} 节点/秒  {verdict}")
+    return ok
+
+# 搜索基准的固定局面：(名称, 棋盘图, 行棋方, 风向, 风持续回合)。
+# 棋盘图每行一个字符串，A/B为双方棋子，"."为空格；棋盘图为None表示初始局面。
+# 局面取自固定种子的自对弈，tactical局面里行棋方能直接取胜或必须堵截。
+SEARCH_POSITIONS = {
+    BoardSize.SMALL: [
+        ("start", None, Player.A, WindDirection.HORIZONTAL, 1),
+        ("opening", [
+            "AA..A",
+            ".B...",
+            "..A..",
+            ".....",
+            "B.B.B"], Player.A, WindDirection.VERTICAL, 3),
+        ("midgame", [
+            ".AAA.",
+            "..B..",
+            "..A..",
+            ".....",
+            ".BBB."], Player.A, WindDirection.DIAGONAL, 1),
+        ("tactical-1", [
+            ".A...",
+            "AA...",
+            "BB.B.",
+            "...A.",
+            "...B."], Player.A, WindDirection.DIAGONAL, 3),
+        ("tactical-2", [
+            ".AA..",
+            ".B...",
+            "A.B..",
+            "...A.",
+            "B..B."], Player.B, WindDirection.VERTICAL, 2)
+    ],
+    BoardSize.MEDIUM: [
+        ("start", None, Player.A, WindDirection.HORIZONTAL, 1),
+        ("opening", [
+            "AAAA..A..",
+            ".........",
+            ".........",
+            ".........",
+            ".B..A....",
+            ".........",
+            ".........",
+            ".........",
+            "B.BBB.B.."], Player.A, WindDirection.VERTICAL, 3),
+        ("midgame", [
+            "..AAAA...",
+            ".........",
+            ".........",
+            "...BA....",
+            ".........",
+            "...A.....",
+            ".........",
+            ".........",
+            "B.BBBB..."], Player.A, WindDirection.DIAGONAL, 1),
+        ("tactical-1", [
+            "...A.A...",
+            ".........",
+            ".........",
+            ".A.......",
+            "AB.BA....",
+            "B...B....",
+            "..A......",
+            ".........",
+            "..B..B..."], Player.A, WindDirection.DIAGONAL, 1),
+        ("tactical-2", [
+            "...AAA...",
+            ".........",
+            ".........",
+            ".....B...",
+            "..A..A...",
+            "...BBA...",
+            ".........",
+            ".........",
+            "..BBB...."], Player.B, WindDirection.VERTICAL, 2)
+    ],
+    BoardSize.LARGE: [
+        ("start", None, Player.A, WindDirection.HORIZONTAL, 1),
+        ("opening", [
+            "AAAAAAA.........",
+            "................",
+            "................",
+            "................",
+            "................",
+            "................",
+            "................",
+            "................",
+            "..B.....A.......",
+            "................",
+            "................",
+            "................",
+            "................",
+            "................",
+            "................",
+            "BB.BBBB..B......"], Player.A, WindDirection.VERTICAL, 3),
+        ("midgame", [
+            ".....AA.A.......",
+            "................",
+            "................",
+            "........B.......",
+            "................",
+            ".........A......",
+            ".........A......",
+            ".........B......",
+            "B.A......A......",
+            ".........A......",
+            "................",
+            "................",
+            "................",
+            "................",
+            "................",
+            "..B.BBBB........"], Player.A, WindDirection.HORIZONTAL, 1),
+        ("tactical-1", [
+            "..A.AAAA........",
+            "................",
+            "................",
+            "................",
+            "................",
+            "................",
+            "................",
+            "................",
+            "AAB.B.B.........",
+            "................",
+            "...A............",
+            "................",
+            "................",
+            "................",
+            "................",
+            "BB.B.B.B........"], Player.A, WindDirection.VERTICAL, 1),
+        ("tactical-2", [
+            "..A.A.AA........",
+            "................",
+            "................",
+            "................",
+            "................",
+            "................",
+            "................",
+            "................",
+            "AAB.B.B.........",
+            ".....A..........",
+            "...A............",
+            "................",
+            "................",
+            "................",
+            "................",
+            "BB.B.B.B........"], Player.B, WindDirection.VERTICAL, 2)
+    ]
+}
+
+# 与基准比较时的默认容差：耗时最多变慢25%，速度最多下降25%
+SEARCH_TIME_TOLERANCE = 0.25
+SEARCH_NPS_TOLERANCE = 0.25
+# 耗时比较的绝对余量（秒），避免毫秒级的结果被计时抖动判为退化
+SEARCH_TIME_SLACK = 0.01
+# 基准耗时短于此值（秒）的搜索节点太少，不比较节点/秒
+SEARCH_NPS_MIN_SECONDS = 0.05
+
+SEARCH_BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "wind_chess_bench_baseline.json")
+
+def load_search_position(board_size: BoardSize, diagram, player: Player, wind_direction: WindDirection, wind_duration: int) -> WindGameState:
+    """把棋盘图转换成局面"""
+    state = WindGameState(board_size, wind_direction, rng=random.Random(0))
+    if diagram is None:
+        return state
+    pieces = {"A": Player.A, "B": Player.B}
+    board = [[pieces.get(cell) for cell in row] for row in diagram]
+    state.load_position(board, player, wind_direction, wind_duration)
+    return state
+
+def run_search_benchmark(sizes: List[BoardSize], difficulties: List[str]) -> List[Dict]:
+    """在每个固定局面上以各难度运行find_best_move，返回每次的测量结果
+
+    每次使用新的AI（空置换表），并固定随机种子，使选出的移动可以重复。
+    中等和困难难度通常在时间预算处停止，这时节点/秒比耗时更能反映速度变化。
+    """
+    results = []
+    for board_size in sizes:
+        for name, diagram, player, wind_direction, wind_duration in SEARCH_POSITIONS[board_size]:
+            for difficulty in difficulties:
+                state = load_search_position(board_size, diagram, player, wind_direction, wind_duration)
+                ai = WindGameAI(difficulty)
+                random.seed(0)
+                start = time.perf_counter()
+                move = ai.find_best_move(state)
+                elapsed = time.perf_counter() - start
+                ai.close()
+
+                stats = ai.last_stats
+                results.append({
+                    "size": board_size.name,
+                    "position": name,
+                    "difficulty": difficulty,
+                    "move": [list(move[0]), list(move[1])] if move else None,
+                    "depth": stats.depth,
+                    "nodes": stats.nodes,
+                    "seconds": round(elapsed, 6),
+                    "nps": round(stats.nodes / elapsed, 1) if elapsed > 0 else 0.0
+                })
+    return results
+
+def _result_key(result: Dict) -> str:
+    return f"{result['size']}/{result['position']}/{result['difficulty']}"
+
+def compare_search_results(results: List[Dict], baseline: List[Dict], time_tolerance: float, nps_tolerance: float) -> List[str]:
+    """与基准比较，返回退化的描述；选出的移动不同只打印提示，不算退化"""
+    reference = {_result_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        key = _result_key(result)
+        base = reference.get(key)
+        if base is None:
+            print(f"  {key}: 基准中没有此项")
+            continue
+        time_limit = base["seconds"] * (1 + time_tolerance) + SEARCH_TIME_SLACK
+        if result["seconds"] > time_limit:
+            regressions.append(f"{key}: 耗时 {result['seconds']:.3f} 秒，基准 {base['seconds']:.3f} 秒")
+        if base["seconds"] >= SEARCH_NPS_MIN_SECONDS and result["nps"] < base["nps"] * (1 - nps_tolerance):
+            regressions.append(f"{key}: {result['nps']:.0f} 节点/秒，基准 {base['nps']:.0f} 节点/秒")
+        if result["move"] != base["move"]:
+            print(f"  {key}: 选出的移动 {result['move']} 与基准 {base['move']} 不同")
+    return regressions
+
+def print_search_results(results: List[Dict]):
+    for result in results:
+        move = result["move"]
+        move_text = f"{tuple(move[0])}->{tuple(move[1])}" if move else "无"
+        print(f"  {_result_key(result):<28} {move_text:<18} 深度 {result['depth']:>2}  {result['nodes']:>8} 节点  "
+              f"{result['seconds']:7.3f} 秒  {result['nps']:10.0f} 节点/秒")
+
+def run_search(sizes: List[BoardSize], difficulties: List[str], output: Optional[str], baseline_path: str,
+               update_baseline: bool, time_tolerance: float, nps_tolerance: float) -> bool:
+    """运行搜索基准，写出JSON，并与基准比较；没有退化时返回True"""
+    results = run_search_benchmark(sizes, difficulties)
+    print("search")
+    print_search_results(results)
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": HAS_NUMPY,
+        "results": results
+    }
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if update_baseline:
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"已更新基准 {baseline_path}")
+        return True
+
+    try:
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    except FileNotFoundError:
+        print(f"没有基准文件 {baseline_path}，跳过比较（用 --update-baseline 生成）")
+        return True
+
+    regressions = compare_search_results(results, baseline, time_tolerance, nps_tolerance)
+    for regression in regressions:
+        print(f"  退化 {regression}")
+    if not regressions:
+        print("  与基准相比没有退化")
+    return not regressions
+
+def verify_incremental_evaluation(games: int = 50, seed: int = 0) -> Tuple[int, int]:
+    """对照检查增量评估和evaluate_board，返回（检查的局面数, 不一致的次数）
+
+    在各种棋盘上随机对局，每一步执行和撤销之后都用两种方法评估双方在三种风向下的分数，
+    并和从位棋盘重新计算的增量评估比较。
+    """
+    rng = random.Random(seed)
+    ai = WindGameAI("easy")
+    checked = 0
+    mismatches = 0
+
+    def check(state):
+        nonlocal checked, mismatches
+        fresh = IncrementalEvaluator.from_bits(state.bits)
+        for player in Player:
+            for wind_direction in WindDirection:
+                expected = ai.evaluate_board(state.board, state.board_size_value, player, wind_direction)
+                if state.evaluator.evaluate(player, wind_direction) != expected or fresh.evaluate(player, wind_direction) != expected:
+                    mismatches += 1
+        checked += 1
+
+    for game in range(games):
+        state = WindGameState(list(BoardSize)[game % len(BoardSize)], rng=random.Random(rng.random()))
+        check(state)
+        while not state.game_over and state.move_count < 200:
+            moves = state.legal_moves()
+            if not moves:
+                break
+            state.apply_move(*rng.choice(moves))
+            check(state)
+        while state.history:
+            state.undo_move()
+            check(state)
+
+    return checked, mismatches
+
+def _random_game_states(games: int, seed: int, max_moves: int = 200):
+    """依次轮换棋盘尺寸随机对局，逐个给出对局中的局面（同一个对象，每次走一步）"""
+    rng = random.Random(seed)
+    for game in range(games):
+        state = WindGameState(list(BoardSize)[game % len(BoardSize)], rng=random.Random(rng.random()))
+        yield state
+        while not state.game_over and state.move_count < max_moves:
+            moves = state.legal_moves()
+            if not moves:
+                break
+            state.apply_move(*rng.choice(moves))
+            yield state
+
+def verify_batch_evaluation(games: int = 50, seed: int = 0) -> Tuple[int, int]:
+    """对照检查NumPy批量评估，返回（检查的局面数, 不一致的次数）
+
+    每个局面用batch_evaluate和evaluate_board比较双方在三种风向下的分数，
+    并用evaluate_moves对全部候选移动批量评估，与逐个走子后的增量评估比较。
+    """
+    ai = WindGameAI("easy")
+    checked = 0
+    mismatches = 0
+    # 每个局面要评估全部候选移动，对局只取前面一段
+    for state in _random_game_states(games, seed, max_moves=60):
+        boards = state_to_array(state)[np.newaxis]
+        moves = state.legal_moves()
+        views = [(player, wind_direction) for player in Player for wind_direction in WindDirection]
+        move_scores = []
+        for player, wind_direction in views:
+            expected = ai.evaluate_board(state.board, state.board_size_value, player, wind_direction)
+            if int(batch_evaluate(boards, player, wind_direction)[0]) != expected:
+                mismatches += 1
+            move_scores.append(evaluate_moves(state, moves, player, wind_direction).tolist() if moves else [])
+
+        current_wind = (state.wind_direction, state.wind_duration)
+        for i, move in enumerate(moves):
+            state.apply_move(move[0], move[1], current_wind)
+            for (player, wind_direction), scores in zip(views, move_scores):
+                if state.evaluator.evaluate(player, wind_direction) != scores[i]:
+                    mismatches += 1
+            state.undo_move()
+        checked += 1
+    return checked, mismatches
+
+# BatchWindGame对照检查时每批最多走的步数
+VERIFY_BATCH_STEPS = 120
+
+def verify_batch_environment(games: int = 50, seed: int = 0) -> Tuple[int, int]:
+    """对照检查BatchWindGame和标量引擎，返回（检查的局面数, 不一致的次数）
+
+    每种棋盘同时进行一批随机对局，每一步比较每局的合法移动集合；
+    走子后用BatchWindGame抽到的风向在标量引擎上执行同一步，比较棋盘、行棋方和胜者。
+    结束的对局立即重新开始。
+    """
+    checked = 0
+    mismatches = 0
+    for board_size in BoardSize:
+        env = BatchWindGame(board_size, max(1, games // len(BoardSize)), seed=seed)
+        size = env.size
+        for _ in range(VERIFY_BATCH_STEPS):
+            mask = env.legal_move_mask()
+            states = [env.to_state(game) for game in range(env.num_games)]
+            for game, state in enumerate(states):
+                expected = set()
+                if state.winner is None:
+                    for (from_x, from_y), (to_x, to_y) in state.legal_moves():
+                        expected.add((from_y * size + from_x, to_y * size + to_x))
+                got = set(zip(*(index.tolist() for index in np.nonzero(mask[game]))))
+                if got != expected:
+                    mismatches += 1
+                checked += 1
+
+            from_sq, to_sq = env.sample_moves(mask)
+            env.step(from_sq, to_sq)
+            for game, state in enumerate(states):
+                if state.winner is not None or from_sq[game] < 0:
+                    continue
+                from_index, to_index = int(from_sq[game]), int(to_sq[game])
+                state.apply_move((from_index % size, from_index // size), (to_index % size, to_index // size),
+                                 (WIND_ORDER[env.wind[game]], int(env.duration[game])))
+                stepped = env.to_state(game)
+                if (state.board != stepped.board or state.winner != stepped.winner
+                        or state.current_player != stepped.current_player):
+                    mismatches += 1
+            env.reset(env.done)
+    return checked, mismatches
+
+# 连线判断对照检查中每种棋盘、每局生成的随机棋盘数
+VERIFY_WIN_BOARDS = 64
+
+def verify_batch_win(games: int = 50, seed: int = 0) -> Tuple[int, int]:
+    """对照检查batch_check_win/batch_winners和BitBoard.has_line，返回（检查的棋盘数, 不一致的次数）
+
+    随机对局中很少出现连线，所以棋盘是随机摆放的：每方最多放满棋子数，
+    一半的棋盘先放一条随机的三连（包括落在底线上、不算连线的横线）。
+    """
+    rng = random.Random(seed)
+    checked = 0
+    mismatches = 0
+    for board_size in BoardSize:
+        size = board_size.value[0]
+        pieces = board_size.value[2]
+        state = WindGameState(board_size, WindDirection.HORIZONTAL)
+        count = max(1, games // len(BoardSize)) * VERIFY_WIN_BOARDS
+        boards = np.zeros((count, size, size), dtype=np.int8)
+        expected = {Player.A: [], Player.B: []}
+        for i in range(count):
+            squares = rng.sample(range(size * size), 2 * pieces)
+            placed = [(Player.A, squares[:rng.randint(0, pieces)]), (Player.B, squares[pieces:pieces + rng.randint(0, pieces)])]
+            if i % 2:
+                dx, dy = rng.choice(LINE_DIRECTIONS)
+                x = rng.randrange(2, size) if dx < 0 else rng.randrange(size - 2 * dx)
+                y = rng.randrange(size - 2 * dy)
+                placed.append((rng.choice(list(Player)), [(y + k * dy) * size + x + k * dx for k in range(3)]))
+            board = [[None] * size for _ in range(size)]
+            for player, player_squares in placed:
+                for sq in player_squares:
+                    board[sq // size][sq % size] = player
+                    boards[i, sq // size, sq % size] = PIECE_CODES[player]
+            state.load_position(board)
+            for player in Player:
+                expected[player].append(state.bits.has_line(player))
+
+        winners = batch_winners(boards)
+        for player in Player:
+            found = batch_check_win(boards, player).tolist()
+            mismatches += sum(1 for got, want in zip(found, expected[player]) if got != want)
+        for i in range(count):
+            if expected[Player.A][i]:
+                want = PIECE_CODES[Player.A]
+            elif expected[Player.B][i]:
+                want = PIECE_CODES[Player.B]
+            else:
+                want = 0
+            if winners[i] != want:
+                mismatches += 1
+        checked += count
+    return checked, mismatches
+
+# 优化过的实现与参照实现的对照检查：名称 -> (检查函数, 是否需要NumPy)
+VERIFY_CHECKS = {
+    "incremental": (verify_incremental_evaluation, False),
+    "batch-eval": (verify_batch_evaluation, True),
+    "batch-env": (verify_batch_environment, True),
+    "batch-win": (verify_batch_win, True)
+}
+
+def run_verify(names: List[str], games: int, seed: int) -> bool:
+    """运行对照检查，打印每项检查的局面数和不一致次数，全部一致时返回True"""
+    ok = True
+    print("verify")
+    for name in names:
+        check, needs_numpy = VERIFY_CHECKS[name]
+        if needs_numpy and not HAS_NUMPY:
+            print(f"  {name:<12} 未安装NumPy，跳过")
+            continue
+        start = time.perf_counter()
+        checked, mismatches = check(games, seed)
+        elapsed = time.perf_counter() - start
+        verdict = "一致" if mismatches == 0 else f"{mismatches} 处不一致"
+        print(f"  {name:<12} {checked:>8} 个局面  {elapsed:7.2f} 秒  {verdict}")
+        ok = ok and mismatches == 0
+    return ok
+
+SIZE_NAMES = {size.name.lower(): size for size in BoardSize}
+
+def main(argv=None) -> int:
+    """命令行入口"""
+    parser = argparse.ArgumentParser(
+        description="风之棋基准测试",
+        epilog="加上 --profile[=counters,cprofile,sample] 或设置 WIND_CHESS_PROFILE 开启性能分析"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    perft_parser = commands.add_parser("perft", help="走法生成的perft计数和速度")
+    perft_parser.add_argument("--size", choices=sorted(SIZE_NAMES) + ["all"], default="all", help="棋盘尺寸")
+    perft_parser.add_argument("--depth", type=int, default=None, help="最大深度（默认见PERFT_DEFAULT_DEPTH）")
+    generator_names = list(MOVE_GENERATORS) + ["vectorized"]
+    perft_parser.add_argument("--generator", choices=generator_names + ["all"], default="all", help="走法生成器")
+
+    search_parser = commands.add_parser("search", help="固定局面上的AI搜索耗时和速度")
+    search_parser.add_argument("--size", choices=sorted(SIZE_NAMES) + ["all"], default="all", help="棋盘尺寸")
+    search_parser.add_argument("--difficulty", choices=list(DIFFICULTY_BUDGETS) + ["all"], default="all", help="AI难度")
+    search_parser.add_argument("--output", default=None, help="把结果写入JSON文件")
+    search_parser.add_argument("--baseline", default=SEARCH_BASELINE_FILE, help="基准JSON文件")
+    search_parser.add_argument("--update-baseline", action="store_true", help="用本次结果覆盖基准文件")
+    search_parser.add_argument("--time-tolerance", type=float, default=SEARCH_TIME_TOLERANCE, help="允许的耗时增加比例")
+    search_parser.add_argument("--nps-tolerance", type=float, default=SEARCH_NPS_TOLERANCE, help="允许的节点/秒下降比例")
+
+    verify_parser = commands.add_parser("verify", help="优化实现与参照实现的对照检查")
+    verify_parser.add_argument("--check", choices=list(VERIFY_CHECKS) + ["all"], default="all", help="检查项目")
+    verify_parser.add_argument("--games", type=int, default=50, help="随机对局数")
+    verify_parser.add_argument("--seed", type=int, default=0, help="随机种子")
+
+    # 性能分析开关在导入wind_chess_profile时已经读取
+    args = parser.parse_args(strip_profile_args(sys.argv[1:] if argv is None else argv))
+    if PROFILE_ENABLED:
+        start_session()
+
+    if args.command == "perft":
+        sizes = list(BoardSize) if args.size == "all" else [SIZE_NAMES[args.size]]
+        generators = generator_names if args.generator == "all" else [args.generator]
+        if "vectorized" in generators and not HAS_NUMPY:
+            print("未安装NumPy，跳过向量化走法生成")
+            generators.remove("vectorized")
+        ok = True
+        for board_size in sizes:
+            depth = args.depth if args.depth is not None else PERFT_DEFAULT_DEPTH[board_size]
+            ok = run_perft(board_size, depth, generators) and ok
+        return 0 if ok else 1
+
+    if args.command == "verify":
+        names = list(VERIFY_CHECKS) if args.check == "all" else [args.check]
+        return 0 if run_verify(names, args.games, args.seed) else 1
+
+    if args.command == "search":
+        sizes = list(BoardSize) if args.size == "all" else [SIZE_NAMES[args.size]]
+        difficulties = list(DIFFICULTY_BUDGETS) if args.difficulty == "all" else [args.difficulty]
+        ok = run_search(sizes, difficulties, args.output, args.baseline, args.update_baseline,
+                        args.time_tolerance, args.nps_tolerance)
+        return 0 if ok else 1
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,646 @@
+import random
+from enum import Enum
+from typing import List, Tuple, Optional
+
+from wind_chess_profile import profiled
+
+class WindDirection(Enum):
+    HORIZONTAL = "水平风"
+    VERTICAL = "垂直风"
+    DIAGONAL = "旋风"
+
+class Player(Enum):
+    A = "●"
+    B = "○"
+
+class BoardSize(Enum):
+    SMALL = (5, 5, 4, "5×5")      # 5x5, 4个棋子
+    MEDIUM = (9, 9, 6, "9×9")     # 9x9, 6个棋子
+    LARGE = (16, 16, 8, "16×16")  # 16x16, 8个棋子
+
+# 风向规则：未到最大持续回合时有70%概率保持，否则在三种风向中均匀抽取
+MAX_WIND_DURATION = 3
+WIND_KEEP_PROBABILITY = 0.7
+
+def other_player(player: Player) -> Player:
+    """获取对手"""
+    return Player.B if player == Player.A else Player.A
+
+_WIND_TRANSITIONS = {}
+
+def wind_transitions(wind_direction: WindDirection, wind_duration: int, max_wind_duration: int = MAX_WIND_DURATION):
+    """风向变化的全部可能结果，返回 ((风向, 持续回合), 概率) 的元组，与change_wind一致"""
+    key = (wind_direction, wind_duration, max_wind_duration)
+    outcomes = _WIND_TRANSITIONS.get(key)
+    if outcomes is None:
+        directions = list(WindDirection)
+        outcomes = []
+        if wind_duration < max_wind_duration:
+            outcomes.append(((wind_direction, wind_duration + 1), WIND_KEEP_PROBABILITY))
+            reroll_probability = (1 - WIND_KEEP_PROBABILITY) / len(directions)
+        else:
+            reroll_probability = 1 / len(directions)
+        for direction in directions:
+            outcomes.append(((direction, 1), reroll_probability))
+        outcomes = _WIND_TRANSITIONS[key] = tuple(outcomes)
+    return outcomes
+
+# 八个方向（风眼上的棋子可以向任意方向移动）
+ALL_DIRECTIONS = [(-1,-1), (-1,0), (-1,1), (0,-1), (0,1), (1,-1), (1,0), (1,1)]
+
+# 各风向允许的移动方向
+WIND_DIRECTIONS = {
+    WindDirection.HORIZONTAL: [(-1,0), (1,0)],
+    WindDirection.VERTICAL: [(0,-1), (0,1)],
+    WindDirection.DIAGONAL: [(-1,-1), (-1,1), (1,-1), (1,1)]
+}
+
+# 连线检测的四个方向：横、竖、主对角线、副对角线
+LINE_DIRECTIONS = [(1,0), (0,1), (1,1), (-1,1)]
+
+def iter_bits(bits: int):
+    """按从低到高的顺序遍历整数中为1的位，返回格子编号"""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+class BitboardMasks:
+    """位棋盘的预计算掩码和走法表，格子编号为 y*size + x"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.full = (1 << (size * size)) - 1
+
+        # 风眼
+        center = size // 2
+        self.center_sq = center * size + center
+        self.center_bit = 1 << self.center_sq
+
+        # 底线（玩家A在第0行，玩家B在最后一行）
+        row = (1 << size) - 1
+        self.home_rows = {
+            Player.A: row,
+            Player.B: row << (size * (size - 1))
+        }
+
+        # 列掩码，用于防止横向移位时跨行
+        first_col = sum(1 << (y * size) for y in range(size))
+        not_first_col = self.full ^ first_col
+        not_last_col = self.full ^ (first_col << (size - 1))
+
+        # 每个方向的移位量和移位后需要保留的格子
+        self.shifts = {}
+        for dx, dy in ALL_DIRECTIONS:
+            mask = self.full
+            if dx == 1:
+                mask &= not_first_col
+            elif dx == -1:
+                mask &= not_last_col
+            self.shifts[(dx, dy)] = (dy * size + dx, mask)
+
+        # 连线表：经过每个格子的全部三连掩码，已排除底线上超过1个棋子的连线
+        self.lines = {player: [[] for _ in range(size * size)] for player in Player}
+        for dx, dy in LINE_DIRECTIONS:
+            for y in range(size):
+                for x in range(size):
+                    end_x, end_y = x + 2 * dx, y + 2 * dy
+                    if not (0 <= end_x < size and 0 <= end_y < size):
+                        continue
+                    squares = [(y + i * dy) * size + (x + i * dx) for i in range(3)]
+                    mask = sum(1 << sq for sq in squares)
+                    for player in Player:
+                        if (mask & self.home_rows[player]).bit_count() > 1:
+                            continue
+                        for sq in squares:
+                            self.lines[player][sq].append(mask)
+        for player in Player:
+            self.lines[player] = [tuple(masks) for masks in self.lines[player]]
+
+        # 走法射线表：rays[风向][格子] 为若干条射线，每条射线是由近到远的 ((x, y), 位) 序列
+        self.rays = {}
+        for wind_direction, directions in WIND_DIRECTIONS.items():
+            table = []
+            for sq in range(size * size):
+                x, y = sq % size, sq // size
+                ray_directions = ALL_DIRECTIONS if sq == self.center_sq else directions
+                rays = []
+                for dx, dy in ray_directions:
+                    ray = []
+                    nx, ny = x + dx, y + dy
+                    while 0 <= nx < size and 0 <= ny < size:
+                        ray.append(((nx, ny), 1 << (ny * size + nx)))
+                        nx, ny = nx + dx, ny + dy
+                    if ray:
+                        rays.append(tuple(ray))
+                table.append(tuple(rays))
+            self.rays[wind_direction] = table
+
+        # 每个格子的连线潜力权重，供增量评估使用
+        self.square_weights = tuple((size - abs(sq % size - center) - abs(sq // size - center)) * 2 for sq in range(size * size))
+
+    def shift(self, bits: int, direction) -> int:
+        """把所有棋子沿方向平移一格"""
+        amount, mask = self.shifts[direction]
+        if amount > 0:
+            return (bits << amount) & mask
+        return (bits >> -amount) & mask
+
+_BITBOARD_MASKS = {}
+
+def get_bitboard_masks(size: int) -> BitboardMasks:
+    """获取（并缓存）指定尺寸的位棋盘掩码"""
+    masks = _BITBOARD_MASKS.get(size)
+    if masks is None:
+        masks = _BITBOARD_MASKS[size] = BitboardMasks(size)
+    return masks
+
+class BitBoard:
+    """位棋盘：每方用一个整数表示，最多256位"""
+
+    __slots__ = ("size", "masks", "a_bits", "b_bits")
+
+    def __init__(self, size: int, a_bits: int = 0, b_bits: int = 0):
+        self.size = size
+        self.masks = get_bitboard_masks(size)
+        self.a_bits = a_bits
+        self.b_bits = b_bits
+
+    @classmethod
+    def from_board(cls, board, size: int) -> "BitBoard":
+        """从二维列表棋盘构建"""
+        a_bits = 0
+        b_bits = 0
+        for y in range(size):
+            for x in range(size):
+                if board[y][x] == Player.A:
+                    a_bits |= 1 << (y * size + x)
+                elif board[y][x] == Player.B:
+                    b_bits |= 1 << (y * size + x)
+        return cls(size, a_bits, b_bits)
+
+    def to_board(self):
+        """转换回二维列表棋盘"""
+        board = [[None for _ in range(self.size)] for _ in range(self.size)]
+        for sq in iter_bits(self.a_bits):
+            board[sq // self.size][sq % self.size] = Player.A
+        for sq in iter_bits(self.b_bits):
+            board[sq // self.size][sq % self.size] = Player.B
+        return board
+
+    def __reduce__(self):
+        # 序列化时不带掩码表，反序列化时按尺寸重新取缓存
+        return (BitBoard, (self.size, self.a_bits, self.b_bits))
+
+    def copy(self) -> "BitBoard":
+        """复制位棋盘"""
+        return BitBoard(self.size, self.a_bits, self.b_bits)
+
+    @property
+    def occupied(self) -> int:
+        """所有棋子"""
+        return self.a_bits | self.b_bits
+
+    def pieces(self, player) -> int:
+        """某一方的棋子"""
+        return self.a_bits if player == Player.A else self.b_bits
+
+    def count(self, player) -> int:
+        """某一方的棋子数"""
+        return self.pieces(player).bit_count()
+
+    def move(self, player, from_sq: int, to_sq: int):
+        """移动棋子（再调用一次即可撤销）"""
+        delta = (1 << from_sq) | (1 << to_sq)
+        if player == Player.A:
+            self.a_bits ^= delta
+        else:
+            self.b_bits ^= delta
+
+    def moved(self, player, from_sq: int, to_sq: int) -> "BitBoard":
+        """返回移动后的新位棋盘"""
+        new_bits = self.copy()
+        new_bits.move(player, from_sq, to_sq)
+        return new_bits
+
+    def has_line(self, player) -> bool:
+        """是否有三子连线（底线上最多一个棋子）"""
+        bits = self.pieces(player)
+        masks = self.masks
+        for direction in LINE_DIRECTIONS:
+            line_bits = bits
+            # 横向连线整条都在底线上时不算
+            if direction == (1, 0):
+                line_bits &= ~masks.home_rows[player]
+            shifted = masks.shift(line_bits, direction)
+            if line_bits & shifted & masks.shift(shifted, direction):
+                return True
+        return False
+
+    @profiled()
+    def has_line_at(self, player, sq: int) -> bool:
+        """只检查经过某个格子的连线，用于判断刚走的一步是否获胜"""
+        bits = self.pieces(player)
+        for mask in self.masks.lines[player][sq]:
+            if bits & mask == mask:
+                return True
+        return False
+
+    def is_winning_move(self, player, from_sq: int, to_sq: int) -> bool:
+        """不改动棋盘，判断这步移动是否形成连线"""
+        bits = (self.pieces(player) & ~(1 << from_sq)) | (1 << to_sq)
+        for mask in self.masks.lines[player][to_sq]:
+            if bits & mask == mask:
+                return True
+        return False
+
+    def line_threats(self, player) -> int:
+        """player已有两子、第三格为空的连线中的空格，即再落一子就成线的位置"""
+        bits = self.pieces(player)
+        empty = self.masks.full & ~(self.a_bits | self.b_bits)
+        lines = self.masks.lines[player]
+        threats = 0
+        for sq in iter_bits(bits):
+            for mask in lines[sq]:
+                rest = mask & ~bits
+                if rest & empty and not rest & (rest - 1):
+                    threats |= rest
+        return threats
+
+    def move_targets(self, sq: int, wind_direction) -> int:
+        """用移位生成某个棋子的全部落点"""
+        masks = self.masks
+        empty = masks.full & ~(self.a_bits | self.b_bits)
+        directions = ALL_DIRECTIONS if sq == masks.center_sq else WIND_DIRECTIONS[wind_direction]
+
+        targets = 0
+        for direction in directions:
+            ray = 1 << sq
+            while True:
+                ray = masks.shift(ray, direction) & empty
+                if not ray:
+                    break
+                targets |= ray
+        return targets
+
+    def has_winning_move(self, player, wind_directions) -> bool:
+        """player在给定的任一风向下是否有一步成线的移动"""
+        return self.winning_paths(player, wind_directions) != 0
+
+    def winning_paths(self, player, wind_directions) -> int:
+        """player在给定风向下所有一步成线的移动经过的格子（含落点），没有时为0
+
+        只有落在这些格子上的棋子才能挡住这些移动。
+        """
+        threats = self.line_threats(player)
+        if not threats:
+            return 0
+        masks = self.masks
+        bits = self.pieces(player)
+        occupied = self.a_bits | self.b_bits
+        paths = 0
+        for to_sq in iter_bits(threats):
+            target = 1 << to_sq
+            # 从空格反向找每个方向上第一个棋子，风向的方向集合是对称的
+            for wind_direction in wind_directions:
+                for direction in WIND_DIRECTIONS[wind_direction]:
+                    ray = target
+                    path = target
+                    while True:
+                        ray = masks.shift(ray, direction)
+                        if not ray or ray & occupied:
+                            break
+                        path |= ray
+                    if ray & bits and self.is_winning_move(player, ray.bit_length() - 1, to_sq):
+                        paths |= path
+            # 风眼上的棋子可以向任意方向移动
+            if bits & masks.center_bit and self.is_winning_move(player, masks.center_sq, to_sq):
+                for direction in ALL_DIRECTIONS:
+                    ray = masks.center_bit
+                    path = 0
+                    while True:
+                        ray = masks.shift(ray, direction)
+                        if not ray or ray & occupied:
+                            break
+                        path |= ray
+                        if ray == target:
+                            paths |= path
+                            break
+        return paths
+
+class IncrementalEvaluator:
+    """随apply_move/undo_move增量更新的评估，结果与WindGameAI.evaluate_board逐位相同
+
+    evaluate_board的各项都只和棋子的数量与位置有关：棋子数、风眼上的棋子、
+    各棋子到风眼的距离权重之和，所以一步移动只需改动走棋方的两个累加值。
+    """
+
+    __slots__ = ("size", "weights", "center_sq", "a_count", "b_count", "a_weight", "b_weight", "a_center", "b_center")
+
+    def __init__(self, size: int, a_count: int = 0, b_count: int = 0, a_weight: int = 0, b_weight: int = 0, a_center: int = 0, b_center: int = 0):
+        self.size = size
+        masks = get_bitboard_masks(size)
+        self.weights = masks.square_weights
+        self.center_sq = masks.center_sq
+        self.a_count = a_count
+        self.b_count = b_count
+        self.a_weight = a_weight
+        self.b_weight = b_weight
+        self.a_center = a_center
+        self.b_center = b_center
+
+    @classmethod
+    def from_bits(cls, bits: BitBoard) -> "IncrementalEvaluator":
+        """从位棋盘计算全部累加值"""
+        weights = bits.masks.square_weights
+        center_bit = bits.masks.center_bit
+        return cls(
+            bits.size,
+            bits.a_bits.bit_count(),
+            bits.b_bits.bit_count(),
+            sum(weights[sq] for sq in iter_bits(bits.a_bits)),
+            sum(weights[sq] for sq in iter_bits(bits.b_bits)),
+            1 if bits.a_bits & center_bit else 0,
+            1 if bits.b_bits & center_bit else 0
+        )
+
+    def __reduce__(self):
+        return (IncrementalEvaluator, (self.size, self.a_count, self.b_count, self.a_weight, self.b_weight, self.a_center, self.b_center))
+
+    def copy(self) -> "IncrementalEvaluator":
+        return IncrementalEvaluator(self.size, self.a_count, self.b_count, self.a_weight, self.b_weight, self.a_center, self.b_center)
+
+    def move(self, player, from_sq: int, to_sq: int):
+        """棋子从from_sq移到to_sq（反向调用即可撤销）"""
+        delta = self.weights[to_sq] - self.weights[from_sq]
+        center = (to_sq == self.center_sq) - (from_sq == self.center_sq)
+        if player == Player.A:
+            self.a_weight += delta
+            self.a_center += center
+        else:
+            self.b_weight += delta
+            self.b_center += center
+
+    @profiled()
+    def evaluate(self, player, wind_direction) -> int:
+        """以player为视角的评估，与evaluate_board相同"""
+        if player == Player.A:
+            count, opponent_count, weight, center = self.a_count, self.b_count, self.a_weight, self.a_center
+        else:
+            count, opponent_count, weight, center = self.b_count, self.a_count, self.b_weight, self.b_center
+        per_piece = 4 if wind_direction == WindDirection.DIAGONAL else 2
+        return ((count - opponent_count) * 10 + center * 30 + weight * 15
+                + (center * 8 + (count - center) * per_piece) * 5)
+
+# Zobrist哈希的固定种子，保证不同进程、不同机器生成相同的键
+ZOBRIST_SEED = 0x57494E444348455353
+MASK64 = (1 << 64) - 1
+
+def splitmix64(seed: int):
+    """SplitMix64伪随机数生成器，输出确定的64位整数序列"""
+    state = seed & MASK64
+    while True:
+        state = (state + 0x9E3779B97F4A7C15) & MASK64
+        z = state
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+        yield z ^ (z >> 31)
+
+class ZobristKeys:
+    """Zobrist随机键：棋子位置、行棋方、风向和风持续回合"""
+
+    def __init__(self, size: int, max_wind_duration: int = MAX_WIND_DURATION):
+        numbers = splitmix64(ZOBRIST_SEED ^ size)
+        self.pieces = {player: [next(numbers) for _ in range(size * size)] for player in Player}
+        self.side = next(numbers)  # 轮到玩家B时异或
+        self.wind = {direction: next(numbers) for direction in WindDirection}
+        self.duration = [0] + [next(numbers) for _ in range(max_wind_duration)]
+
+    def wind_key(self, wind_direction, wind_duration) -> int:
+        """风向和持续回合对应的键"""
+        return self.wind[wind_direction] ^ self.duration[wind_duration]
+
+_ZOBRIST_KEYS = {}
+
+def get_zobrist_keys(size: int) -> ZobristKeys:
+    """获取（并缓存）指定尺寸的Zobrist键"""
+    keys = _ZOBRIST_KEYS.get(size)
+    if keys is None:
+        keys = _ZOBRIST_KEYS[size] = ZobristKeys(size)
+    return keys
+
+class WindGameState:
+    """风之棋规则引擎，不依赖Tk，可用于无界面对局和AI模拟"""
+
+    def __init__(self, board_size: BoardSize, wind_direction: Optional[WindDirection] = None, rng: Optional[random.Random] = None):
+        self.board_size_enum = board_size
+        self.board_size_value = board_size.value[0]
+        self.pieces_per_player = board_size.value[2]
+        self.rng = rng if rng is not None else random.Random()
+
+        # 初始化游戏状态
+        self.board = [[None for _ in range(self.board_size_value)] for _ in range(self.board_size_value)]
+        self.wind_direction = wind_direction if wind_direction is not None else self.rng.choice(list(WindDirection))
+        self.wind_duration = 1
+        self.max_wind_duration = MAX_WIND_DURATION
+        self.current_player = Player.A
+        self.winner = None
+        self.move_count = 0
+
+        # 悔棋记录：(起点, 终点, 行棋方, 风向, 风持续回合, 胜者, 哈希)
+        self.history = []
+
+        self.initialize_board()
+
+        # 位棋盘与二维列表棋盘同步更新，供胜负判定和AI评估使用
+        self.bits = BitBoard.from_board(self.board, self.board_size_value)
+        self.evaluator = IncrementalEvaluator.from_bits(self.bits)
+
+        # 局面的64位Zobrist哈希，每步增量更新
+        self.zobrist = get_zobrist_keys(self.board_size_value)
+        self.key = self.compute_key()
+
+    def __getstate__(self):
+        # Zobrist键表按尺寸缓存，不随局面一起序列化（例如传给其他进程）
+        state = self.__dict__.copy()
+        del state["zobrist"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.zobrist = get_zobrist_keys(self.board_size_value)
+
+    @property
+    def game_over(self) -> bool:
+        """游戏是否结束"""
+        return self.winner is not None
+
+    def initialize_board(self):
+        """初始化棋盘"""
+        size = self.board_size_value
+        pieces = self.pieces_per_player
+
+        a_positions = []
+        step = max(1, size // (pieces + 1))
+        for i in range(pieces):
+            pos = i * step + step // 2
+            if pos >= size:
+                pos = size - 1 - (i % (size // 2))
+            a_positions.append((pos, 0))
+
+        for x, y in a_positions:
+            self.board[y][x] = Player.A
+
+        b_positions = []
+        for i in range(pieces):
+            pos = i * step + step // 2
+            if pos >= size:
+                pos = size - 1 - (i % (size // 2))
+            b_positions.append((pos, size-1))
+
+        for x, y in b_positions:
+            self.board[y][x] = Player.B
+
+    def copy(self) -> "WindGameState":
+        """复制当前局面（棋盘和随机数生成器均独立）"""
+        new_state = WindGameState.__new__(WindGameState)
+        new_state.__dict__.update(self.__dict__)
+        new_state.board = [row[:] for row in self.board]
+        new_state.history = self.history[:]
+        new_state.bits = self.bits.copy()
+        new_state.evaluator = self.evaluator.copy()
+        new_state.rng = random.Random()
+        new_state.rng.setstate(self.rng.getstate())
+        return new_state
+
+    def load_position(self, board, current_player: Player = Player.A, wind_direction: Optional[WindDirection] = None, wind_duration: int = 1):
+        """换成给定的局面（二维列表棋盘），悔棋记录清空，胜负按棋盘重新判断"""
+        self.board = [row[:] for row in board]
+        self.current_player = current_player
+        if wind_direction is not None:
+            self.wind_direction = wind_direction
+        self.wind_duration = wind_duration
+        self.history = []
+        self.bits = BitBoard.from_board(self.board, self.board_size_value)
+        self.evaluator = IncrementalEvaluator.from_bits(self.bits)
+        self.winner = None
+        for player in Player:
+            if self.bits.has_line(player):
+                self.winner = player
+        self.key = self.compute_key()
+
+    def compute_key(self) -> int:
+        """从头计算局面哈希（增量更新的参照）"""
+        zobrist = self.zobrist
+        key = 0
+        for player in Player:
+            for sq in iter_bits(self.bits.pieces(player)):
+                key ^= zobrist.pieces[player][sq]
+        if self.current_player == Player.B:
+            key ^= zobrist.side
+        key ^= zobrist.wind_key(self.wind_direction, self.wind_duration)
+        return key
+
+    @profiled()
+    def get_valid_moves(self, piece_pos) -> List[Tuple[int, int]]:
+        """获取合法移动：沿预计算的射线前进，遇到第一个棋子为止"""
+        x, y = piece_pos
+        if not self.board[y][x]:
+            return []
+
+        occupied = self.bits.a_bits | self.bits.b_bits
+        rays = self.bits.masks.rays[self.wind_direction][y * self.board_size_value + x]
+
+        valid_moves = []
+        for ray in rays:
+            for pos, bit in ray:
+                if occupied & bit:
+                    break
+                valid_moves.append(pos)
+
+        return valid_moves
+
+    def legal_moves(self, player: Optional[Player] = None) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+        """获取指定玩家（默认当前玩家）的全部合法移动"""
+        if player is None:
+            player = self.current_player
+
+        size = self.board_size_value
+        all_moves = []
+        for sq in iter_bits(self.bits.pieces(player)):
+            from_pos = (sq % size, sq // size)
+            for to_pos in self.get_valid_moves(from_pos):
+                all_moves.append((from_pos, to_pos))
+
+        return all_moves
+
+    @profiled()
+    def apply_move(self, from_pos, to_pos, wind: Optional[Tuple[WindDirection, int]] = None):
+        """执行移动：检查胜利，未分胜负则交换行棋方并改变风向
+
+        wind为(风向, 持续回合)时直接使用该风向，否则按规则随机变化。
+        """
+        from_x, from_y = from_pos
+        to_x, to_y = to_pos
+
+        self.history.append((from_pos, to_pos, self.current_player, self.wind_direction, self.wind_duration, self.winner, self.key))
+
+        self.board[to_y][to_x] = self.board[from_y][from_x]
+        self.board[from_y][from_x] = None
+        from_sq = from_y * self.board_size_value + from_x
+        to_sq = to_y * self.board_size_value + to_x
+        self.bits.move(self.current_player, from_sq, to_sq)
+        self.evaluator.move(self.current_player, from_sq, to_sq)
+        piece_keys = self.zobrist.pieces[self.current_player]
+        self.key ^= piece_keys[from_sq] ^ piece_keys[to_sq]
+        self.move_count += 1
+
+        # 新的连线一定经过刚落下的棋子
+        if self.bits.has_line_at(self.current_player, to_sq):
+            self.winner = self.current_player
+            return
+
+        self.current_player = other_player(self.current_player)
+        self.key ^= self.zobrist.side
+        if wind is None:
+            self.change_wind()
+        else:
+            self.set_wind(wind[0], wind[1])
+
+    def undo_move(self):
+        """撤销上一步移动"""
+        from_pos, to_pos, player, wind_direction, wind_duration, winner, key = self.history.pop()
+        from_x, from_y = from_pos
+        to_x, to_y = to_pos
+
+        self.board[from_y][from_x] = self.board[to_y][to_x]
+        self.board[to_y][to_x] = None
+        from_sq = from_y * self.board_size_value + from_x
+        to_sq = to_y * self.board_size_value + to_x
+        self.bits.move(player, from_sq, to_sq)
+        self.evaluator.move(player, to_sq, from_sq)
+        self.move_count -= 1
+        self.current_player = player
+        self.wind_direction = wind_direction
+        self.wind_duration = wind_duration
+        self.winner = winner
+        self.key = key
+
+    def check_win(self, player) -> bool:
+        """检查是否获胜"""
+        return self.bits.has_line(player)
+
+    def change_wind(self) -> bool:
+        """改变风向，返回风向是否重新抽取"""
+        if self.wind_duration < self.max_wind_duration and self.rng.random() < WIND_KEEP_PROBABILITY:
+            self.set_wind(self.wind_direction, self.wind_duration + 1)
+            return False
+
+        self.set_wind(self.rng.choice(list(WindDirection)), 1)
+        return True
+
+    def set_wind(self, wind_direction: WindDirection, wind_duration: int):
+        """设置风向和持续回合，同时更新哈希"""
+        self.key ^= self.zobrist.wind_key(self.wind_direction, self.wind_duration) ^ self.zobrist.wind_key(wind_direction, wind_duration)
+        self.wind_direction = wind_direction
+        self.wind_duration = wind_duration
@@ -2,22 +2,28 @@ import random
 import time
 import os
 import json
-import sys
+import logging
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
+from tkinter import messagebox, scrolledtext
 from enum import Enum
-from typing import List, Tuple, Optional, Dict
+from typing import List, Dict
 from datetime import datetime
 import threading
+import queue
 
-class WindDirection(Enum):
-    HORIZONTAL = "水平风"
-    VERTICAL = "垂直风"
-    DIAGONAL = "旋风"
+from wind_chess_engine import Player, BoardSize, WindGameState, iter_bits
+from wind_chess_ai import WindGameAI, enable_search_log
+from wind_chess_profile import profiled, start_session, start_watchdog, watched
+
+# AI在后台线程思考，界面用after轮询结果（毫秒）
+AI_POLL_INTERVAL = 50
+# AI落子前至少等待的时间，保持原来的节奏感（毫秒）
+AI_MOVE_DELAY = 1500
+# 后台思考命中时几乎立即落子
+AI_PONDER_MOVE_DELAY = 300
+
+logger = logging.getLogger("wind_chess.gui")
 
-class Player(Enum):
-    A = "●"
-    B = "○"
 
 class GameMode(Enum):
     TUTORIAL = "新手介绍"
@@ -25,11 +31,6 @@ class GameMode(Enum):
     PVE = "美少女对战"
     CHAT = "与风子聊天"
 
-class BoardSize(Enum):
-    SMALL = (5, 5, 4, "5×5")      # 5x5, 4个棋子
-    MEDIUM = (9, 9, 6, "9×9")     # 9x9, 6个棋子
-    LARGE = (16, 16, 8, "16×16")  # 16x16, 8个棋子
-
 class AchievementManager:
     """成就管理器，记录玩家进度和特殊剧情触发"""
 
@@ -66,7 +67,8 @@ class AchievementManager:
             "settings": {
                 "dialogue_display_time": 4,  # 默认4秒
                 "music_enabled": True,
-                "sound_effects_enabled": True
+                "sound_effects_enabled": True,
+                "show_search_stats": False  # 对战时显示AI搜索统计（调试用）
             },
             "statistics": {
                 "first_play_date": datetime.now().strftime("%Y-%m-%d"),
@@ -92,6 +94,7 @@ class AchievementManager:
 
         return default_data
 
+    @profiled()
     def save(self):
         """保存数据"""
         try:
@@ -354,147 +357,6 @@ class ACGNBeautyGirl:
         else:
             return "斗志昂扬"
 
-class WindGameAI:
-    """智能AI对手"""
-
-    def __init__(self, difficulty: str = "medium"):
-        self.difficulty = difficulty
-
-    def evaluate_board(self, board, board_size, player, wind_direction) -> float:
-        """评估棋盘状态"""
-        score = 0
-        center = board_size // 2
-
-        player_pieces = sum(1 for row in board for cell in row if cell == player)
-        opponent_pieces = sum(1 for row in board for cell in row if cell is not None and cell != player)
-        score += (player_pieces - opponent_pieces) * 10
-
-        if board[center][center] == player:
-            score += 30
-
-        score += self._evaluate_lines(board, board_size, player) * 15
-        score += self._evaluate_mobility(board, board_size, player, wind_direction) * 5
-
-        return score
-
-    def _evaluate_lines(self, board, board_size, player) -> int:
-        """评估连线潜力"""
-        lines = 0
-        center = board_size // 2
-
-        for y in range(board_size):
-            for x in range(board_size):
-                if board[y][x] == player:
-                    distance_to_center = abs(x - center) + abs(y - center)
-                    lines += (board_size - distance_to_center) * 2
-
-        return lines
-
-    def _evaluate_mobility(self, board, board_size, player, wind_direction) -> int:
-        """评估移动灵活性"""
-        mobility = 0
-        center = board_size // 2
-
-        for y in range(board_size):
-            for x in range(board_size):
-                if board[y][x] == player:
-                    if (x, y) == (center, center):
-                        mobility += 8
-                    elif wind_direction == WindDirection.HORIZONTAL:
-                        mobility += 2
-                    elif wind_direction == WindDirection.VERTICAL:
-                        mobility += 2
-                    elif wind_direction == WindDirection.DIAGONAL:
-                        mobility += 4
-
-        return mobility
-
-    def find_best_move(self, game_state) -> Optional[Tuple[Tuple[int, int], Tuple[int, int]]]:
-        """寻找最佳移动"""
-        board = game_state["board"]
-        board_size = game_state["board_size"]
-        player = game_state["current_player"]
-        wind_direction = game_state["wind_direction"]
-
-        best_score = -float('inf')
-        best_move = None
-
-        all_moves = []
-        for y in range(board_size):
-            for x in range(board_size):
-                if board[y][x] == player:
-                    from_pos = (x, y)
-                    valid_moves = self._get_valid_moves_simulation(board, board_size, from_pos, wind_direction)
-                    for to_pos in valid_moves:
-                        all_moves.append((from_pos, to_pos))
-
-        if not all_moves:
-            return None
-
-        if self.difficulty == "easy":
-            scored_moves = []
-            for move in all_moves:
-                from_pos, to_pos = move
-                temp_board = [row[:] for row in board]
-                temp_board[to_pos[1]][to_pos[0]] = player
-                temp_board[from_pos[1]][from_pos[0]] = None
-
-                score = self.evaluate_board(temp_board, board_size, player, wind_direction)
-                scored_moves.append((score, move))
-
-            scored_moves.sort(key=lambda x: x[0], reverse=True)
-            if len(scored_moves) > 3:
-                return scored_moves[random.randint(0, 2)][1]
-            else:
-                return scored_moves[0][1]
-        else:
-            for move in all_moves:
-                from_pos, to_pos = move
-                temp_board = [row[:] for row in board]
-                temp_board[to_pos[1]][to_pos[0]] = player
-                temp_board[from_pos[1]][from_pos[0]] = None
-
-                score = self.evaluate_board(temp_board, board_size, player, wind_direction)
-
-                opponent = Player.B if player == Player.A else Player.A
-                opponent_score = self.evaluate_board(temp_board, board_size, opponent, wind_direction)
-
-                final_score = score - opponent_score * 0.5
-
-                if final_score > best_score:
-                    best_score = final_score
-                    best_move = move
-
-        return best_move
-
-    def _get_valid_moves_simulation(self, board, board_size, piece_pos, wind_direction):
-        """模拟获取合法移动"""
-        x, y = piece_pos
-        center = board_size // 2
-        valid_moves = []
-
-        if (x, y) == (center, center):
-            directions = [(-1,-1), (-1,0), (-1,1), (0,-1), (0,1), (1,-1), (1,0), (1,1)]
-        elif wind_direction == WindDirection.HORIZONTAL:
-            directions = [(-1,0), (1,0)]
-        elif wind_direction == WindDirection.VERTICAL:
-            directions = [(0,-1), (0,1)]
-        elif wind_direction == WindDirection.DIAGONAL:
-            directions = [(-1,-1), (-1,1), (1,-1), (1,1)]
-
-        for dx, dy in directions:
-            step = 1
-            while True:
-                nx, ny = x + dx*step, y + dy*step
-                if not (0 <= nx < board_size and 0 <= ny < board_size):
-                    break
-                if board[ny][nx] is not None:
-                    break
-                valid_moves.append((nx, ny))
-                step += 1
-
-        return valid_moves
-
 class GameTips:
     """游戏提示管理器"""
 
@@ -844,6 +706,7 @@ class WindGameGUI:
             cursor="hand2"
         ).pack(pady=20)
 
+    @watched()
     def start_game(self, game_mode, board_size):
         """开始游戏"""
         if self.current_window:
@@ -940,15 +803,8 @@ class GameWindow:
         self.achievement_manager = achievement_manager
         self.back_callback = back_callback
 
-        # 初始化游戏状态
-        self.board = [[None for _ in range(self.board_size_value)] for _ in range(self.board_size_value)]
-        self.wind_direction = random.choice(list(WindDirection))
-        self.wind_duration = 1
-        self.max_wind_duration = 3
-        self.current_player = Player.A
-        self.game_over = False
-        self.winner = None
-        self.move_count = 0
+        # 初始化游戏状态（规则由无界面的引擎负责）
+        self.state = WindGameState(board_size)
         self.selected_piece = None
         self.valid_moves = []
 
@@ -962,8 +818,27 @@ class GameWindow:
             self.ai = None
             self.season_event_manager = None
 
-        # 初始化棋盘
-        self.initialize_board()
+        # 后台思考的AI线程
+        self.ai_thread = None
+        self.ai_queue = None
+        self.ai_stop_event = None
+        self.ai_poll_id = None
+        self.ai_start_time = 0.0
+        self.ai_result = None
+        # 玩家思考时AI在后台分析
+        self.ponder_thread = None
+        self.ponder_stop_event = None
+
+        # 画布上保留的物件，draw_board只移动和修改它们
+        self.board_geometry = None
+        self.grid_items = []
+        self.eye_item = None
+        self.piece_items = {}
+        self.drawn_bits = (0, 0)
+        self.selection_item = None
+        self.marker_items = []
+        self.markers_shown = 0
+        self.drawn_highlight = None
 
         # 创建界面
         self.frame = tk.Frame(self.root, bg="#f0f0f0")
@@ -972,32 +847,6 @@ class GameWindow:
         self.create_widgets()
         self.update_display()
 
-    def initialize_board(self):
-        """初始化棋盘"""
-        size = self.board_size_value
-        pieces = self.pieces_per_player
-
-        a_positions = []
-        step = max(1, size // (pieces + 1))
-        for i in range(pieces):
-            pos = i * step + step // 2
-            if pos >= size:
-                pos = size - 1 - (i % (size // 2))
-            a_positions.append((pos, 0))
-
-        for x, y in a_positions:
-            self.board[y][x] = Player.A
-
-        b_positions = []
-        for i in range(pieces):
-            pos = i * step + step // 2
-            if pos >= size:
-                pos = size - 1 - (i % (size // 2))
-            b_positions.append((pos, size-1))
-
-        for x, y in b_positions:
-            self.board[y][x] = Player.B
-
     def create_widgets(self):
         """创建界面组件"""
         # 顶部信息栏
@@ -1050,6 +899,29 @@ class GameWindow:
         self.dialogue_text.pack(pady=5, padx=5, fill=tk.BOTH, expand=False)
         self.dialogue_text.config(state=tk.DISABLED)
 
+        # AI搜索统计（调试面板，在设置中开启）
+        self.search_stats_text = None
+        if self.ai and self.achievement_manager.get_setting("show_search_stats"):
+            tk.Label(
+                right_panel,
+                text="🔍 搜索统计",
+                font=("微软雅黑", 12, "bold"),
+                bg="#f0f0f0",
+                fg="#666"
+            ).pack(pady=(5, 5))
+
+            self.search_stats_text = tk.Text(
+                right_panel,
+                font=("Consolas", 9),
+                wrap=tk.WORD,
+                height=10,
+                width=30,
+                bg="#f5f5f5",
+                relief=tk.FLAT
+            )
+            self.search_stats_text.pack(pady=5, padx=5)
+            self.search_stats_text.config(state=tk.DISABLED)
+
         # 操作提示
         tk.Label(
             right_panel,
@@ -1091,7 +963,7 @@ class GameWindow:
         tk.Button(
             button_frame,
             text="返回主菜单",
-            command=self.back_callback,
+            command=self.leave_game,
             font=("微软雅黑", 10),
             bg="#ccc",
             fg="black",
@@ -1100,100 +972,168 @@ class GameWindow:
             cursor="hand2"
         ).pack(pady=5)
 
+    @watched()
     def on_canvas_resize(self, event):
         """画布大小改变时重绘"""
         self.draw_board()
 
+    @profiled()
     def draw_board(self):
-        """绘制棋盘"""
-        self.canvas.delete("all")
+        """绘制棋盘
+
+        画布上的物件只创建一次：网格和风眼只在画布大小改变时移动，
+        棋子按位棋盘与上次绘制的差异更新，选中圈和移动标记在高亮层中复用。
+        """
+        if not self._layout_board():
+            return
+        self._draw_pieces()
+        self.draw_highlights()
 
+    def _layout_board(self) -> bool:
+        """按画布大小计算格子尺寸，尺寸改变时移动所有物件；画布太小时返回False"""
         width = self.canvas.winfo_width()
         height = self.canvas.winfo_height()
 
         if width < 100 or height < 100:
-            return
+            return False
 
         # 计算单元格大小
         cell_size = min(width // (self.board_size_value + 2), height // (self.board_size_value + 2))
         offset_x = (width - cell_size * self.board_size_value) // 2
         offset_y = (height - cell_size * self.board_size_value) // 2
+        geometry = (offset_x, offset_y, cell_size)
+        if geometry == self.board_geometry:
+            return True
 
-        # 绘制网格
-        for i in range(self.board_size_value + 1):
-            # 横线
-            self.canvas.create_line(
-                offset_x, offset_y + i * cell_size,
-                offset_x + self.board_size_value * cell_size, offset_y + i * cell_size,
-                fill="#ccc", width=1
-            )
-            # 竖线
-            self.canvas.create_line(
-                offset_x + i * cell_size, offset_y,
-                offset_x + i * cell_size, offset_y + self.board_size_value * cell_size,
-                fill="#ccc", width=1
-            )
+        # 保存位置信息
+        self.board_geometry = geometry
+        self.board_offset_x = offset_x
+        self.board_offset_y = offset_y
+        self.cell_size = cell_size
 
-        # 绘制风眼
+        # 网格：每条线一对横线和竖线
+        board_length = self.board_size_value * cell_size
+        if not self.grid_items:
+            for i in range(self.board_size_value + 1):
+                self.grid_items.append((
+                    self.canvas.create_line(0, 0, 0, 0, fill="#ccc", width=1, tags=("grid",)),
+                    self.canvas.create_line(0, 0, 0, 0, fill="#ccc", width=1, tags=("grid",))
+                ))
+        for i, (row_line, column_line) in enumerate(self.grid_items):
+            self.canvas.coords(row_line, offset_x, offset_y + i * cell_size, offset_x + board_length, offset_y + i * cell_size)
+            self.canvas.coords(column_line, offset_x + i * cell_size, offset_y, offset_x + i * cell_size, offset_y + board_length)
+
+        # 风眼
         center = self.board_size_value // 2
-        center_x = offset_x + center * cell_size + cell_size // 2
-        center_y = offset_y + center * cell_size + cell_size // 2
-        self.canvas.create_oval(
+        center_x, center_y = self._square_center(center, center)
+        if self.eye_item is None:
+            self.eye_item = self.canvas.create_oval(0, 0, 0, 0, fill="#ffd700", outline="#ff8c00", width=2, tags=("eye",))
+        self.canvas.coords(
+            self.eye_item,
             center_x - cell_size // 3, center_y - cell_size // 3,
-            center_x + cell_size // 3, center_y + cell_size // 3,
-            fill="#ffd700", outline="#ff8c00", width=2
+            center_x + cell_size // 3, center_y + cell_size // 3
         )
 
-        # 绘制棋子
-        for y in range(self.board_size_value):
-            for x in range(self.board_size_value):
-                piece = self.board[y][x]
-                if piece:
-                    px = offset_x + x * cell_size + cell_size // 2
-                    py = offset_y + y * cell_size + cell_size // 2
-                    radius = cell_size // 2 - 2
-
-                    color = "#000000" if piece == Player.A else "#ffffff"
-                    outline_color = "#333333"
+        for pos, item in self.piece_items.items():
+            self.canvas.coords(item, *self._piece_box(pos))
+        # 高亮层按新尺寸重新定位
+        self.drawn_highlight = None
+        return True
+
+    def _square_center(self, x, y):
+        """格子中心的画布坐标"""
+        offset_x, offset_y, cell_size = self.board_geometry
+        return offset_x + x * cell_size + cell_size // 2, offset_y + y * cell_size + cell_size // 2
+
+    def _piece_box(self, pos):
+        """棋子圆形的外接矩形"""
+        px, py = self._square_center(*pos)
+        radius = self.cell_size // 2 - 2
+        return px - radius, py - radius, px + radius, py + radius
+
+    def _draw_pieces(self):
+        """只更新与上次绘制不同的格子，走一步只涉及起点和终点两个格子"""
+        bits = self.state.bits
+        drawn_a, drawn_b = self.drawn_bits
+        changed = (bits.a_bits ^ drawn_a) | (bits.b_bits ^ drawn_b)
+        if not changed:
+            return
 
-                    self.canvas.create_oval(
-                        px - radius, py - radius,
-                        px + radius, py + radius,
-                        fill=color, outline=outline_color, width=2
-                    )
+        size = self.board_size_value
+        # 先收回变化格子上的棋子物件，再移到新的位置上复用
+        free_items = []
+        for sq in iter_bits(changed):
+            item = self.piece_items.pop((sq % size, sq // size), None)
+            if item is not None:
+                free_items.append(item)
+
+        created = False
+        for sq in iter_bits(changed & (bits.a_bits | bits.b_bits)):
+            pos = (sq % size, sq // size)
+            color = "#000000" if bits.a_bits >> sq & 1 else "#ffffff"
+            if free_items:
+                item = free_items.pop()
+                self.canvas.coords(item, *self._piece_box(pos))
+                self.canvas.itemconfig(item, fill=color)
+            else:
+                item = self.canvas.create_oval(*self._piece_box(pos), fill=color, outline="#333333", width=2, tags=("piece",))
+                created = True
+            self.piece_items[pos] = item
+
+        for item in free_items:
+            self.canvas.delete(item)
+        if created:
+            # 新建的棋子不能盖住高亮层
+            self.canvas.tag_raise("highlight")
+        self.drawn_bits = (bits.a_bits, bits.b_bits)
+
+    def draw_highlights(self):
+        """更新选中圈和有效移动标记；点击棋盘只改变这一层"""
+        if self.board_geometry is None:
+            return
+        highlight = (self.board_geometry, self.selected_piece, tuple(self.valid_moves))
+        if highlight == self.drawn_highlight:
+            return
+        self.drawn_highlight = highlight
+        cell_size = self.cell_size
 
         # 高亮选中的棋子
+        if self.selection_item is None:
+            self.selection_item = self.canvas.create_oval(
+                0, 0, 0, 0, outline="#1eaef6", width=4, state=tk.HIDDEN, tags=("highlight", "selection")
+            )
         if self.selected_piece:
-            x, y = self.selected_piece
-            px = offset_x + x * cell_size + cell_size // 2
-            py = offset_y + y * cell_size + cell_size // 2
-            self.canvas.create_oval(
+            px, py = self._square_center(*self.selected_piece)
+            self.canvas.coords(
+                self.selection_item,
                 px - cell_size // 2, py - cell_size // 2,
-                px + cell_size // 2, py + cell_size // 2,
-                outline="#1eaef6", width=4
+                px + cell_size // 2, py + cell_size // 2
             )
-
-        # 高亮有效移动
-        for x, y in self.valid_moves:
-            px = offset_x + x * cell_size + cell_size // 2
-            py = offset_y + y * cell_size + cell_size // 2
-            self.canvas.create_oval(
-                px - 5, py - 5,
-                px + 5, py + 5,
-                fill="#1eaef6", outline=""
-            )
-
-        # 保存位置信息
-        self.board_offset_x = offset_x
-        self.board_offset_y = offset_y
-        self.cell_size = cell_size
-
+            self.canvas.itemconfig(self.selection_item, state=tk.NORMAL)
+        else:
+            self.canvas.itemconfig(self.selection_item, state=tk.HIDDEN)
+
+        # 高亮有效移动，标记物件按需增加，多余的隐藏
+        while len(self.marker_items) < len(self.valid_moves):
+            self.marker_items.append(self.canvas.create_oval(
+                0, 0, 0, 0, fill="#1eaef6", outline="", state=tk.HIDDEN, tags=("highlight", "marker")
+            ))
+        for i, (item, (x, y)) in enumerate(zip(self.marker_items, self.valid_moves)):
+            px, py = self._square_center(x, y)
+            self.canvas.coords(item, px - 5, py - 5, px + 5, py + 5)
+            if i >= self.markers_shown:
+                self.canvas.itemconfig(item, state=tk.NORMAL)
+        for item in self.marker_items[len(self.valid_moves):self.markers_shown]:
+            self.canvas.itemconfig(item, state=tk.HIDDEN)
+        self.markers_shown = len(self.valid_moves)
+
+    @watched()
     def on_canvas_click(self, event):
         """处理棋盘点击"""
-        if self.game_over:
+        if self.state.game_over:
             return
 
-        if self.game_mode == GameMode.PVE and self.current_player == Player.B:
+        if self.game_mode == GameMode.PVE and self.state.current_player == Player.B:
             return  # AI的回合
 
         x = (event.x - self.board_offset_x) // self.cell_size
@@ -1206,7 +1146,7 @@ class GameWindow:
         if self.selected_piece:
             if (x, y) in self.valid_moves:
                 self.move_piece(self.selected_piece, (x, y))
-            elif self.board[y][x] == self.current_player:
+            elif self.state.board[y][x] == self.state.current_player:
                 # 选择另一个棋子
                 self.select_piece((x, y))
             else:
@@ -1215,9 +1155,10 @@ class GameWindow:
                 self.valid_moves = []
         else:
             # 选择棋子
-            if self.board[y][x] == self.current_player:
+            if self.state.board[y][x] == self.state.current_player:
                 self.select_piece((x, y))
 
+        # 没有走棋时棋子层没有变化，只更新高亮层
         self.draw_board()
 
     def select_piece(self, pos):
@@ -1227,57 +1168,27 @@ class GameWindow:
 
     def get_valid_moves(self, piece_pos):
         """获取合法移动"""
-        x, y = piece_pos
-        player = self.board[y][x]
-        if not player:
-            return []
-
-        valid_moves = []
-        center = self.board_size_value // 2
-
-        if (x, y) == (center, center):
-            directions = [(-1,-1), (-1,0), (-1,1), (0,-1), (0,1), (1,-1), (1,0), (1,1)]
-        elif self.wind_direction == WindDirection.HORIZONTAL:
-            directions = [(-1,0), (1,0)]
-        elif self.wind_direction == WindDirection.VERTICAL:
-            directions = [(0,-1), (0,1)]
-        elif self.wind_direction == WindDirection.DIAGONAL:
-            directions = [(-1,-1), (-1,1), (1,-1), (1,1)]
-
-        for dx, dy in directions:
-            step = 1
-            while True:
-                nx, ny = x + dx*step, y + dy*step
-                if not (0 <= nx < self.board_size_value and 0 <= ny < self.board_size_value):
-                    break
-                if self.board[ny][nx] is not None:
-                    break
-                valid_moves.append((nx, ny))
-                step += 1
-
-        return valid_moves
+        return self.state.get_valid_moves(piece_pos)
 
     def move_piece(self, from_pos, to_pos, is_ai=False):
         """移动棋子"""
-        from_x, from_y = from_pos
-        to_x, to_y = to_pos
-
-        self.board[to_y][to_x] = self.board[from_y][from_x]
-        self.board[from_y][from_x] = None
-        self.move_count += 1
+        mover = self.state.current_player
+        if not is_ai:
+            self.stop_pondering()
+        self.state.apply_move(from_pos, to_pos)
         self.selected_piece = None
         self.valid_moves = []
 
         # 显示对话
         if self.game_mode == GameMode.PVE and self.beauty_girl:
-            if not is_ai and self.current_player == Player.A:
+            if not is_ai and mover == Player.A:
                 move_quality = self._evaluate_move_quality(from_pos, to_pos, Player.A)
                 if move_quality > 0:
                     self.add_dialogue(self.beauty_girl.name, self.beauty_girl.get_dialogue('player_good_move'))
                 else:
                     self.add_dialogue(self.beauty_girl.name, self.beauty_girl.get_dialogue('player_bad_move'))
 
-            elif is_ai and self.current_player == Player.B:
+            elif is_ai and mover == Player.B:
                 move_quality = self._evaluate_move_quality(from_pos, to_pos, Player.B)
                 if move_quality > 0:
                     self.add_dialogue(self.beauty_girl.name, self.beauty_girl.get_dialogue('good_ai_move'))
@@ -1288,12 +1199,9 @@ class GameWindow:
                     self.add_dialogue(self.beauty_girl.name, self.beauty_girl.get_dialogue('special_actions'))
 
         # 检查胜利条件
-        if self.check_win(self.current_player):
-            self.game_over = True
-            self.winner = self.current_player
-
+        if self.state.game_over:
             if self.game_mode == GameMode.PVE and self.achievement_manager:
-                player_won = self.winner == Player.A
+                player_won = self.state.winner == Player.A
                 self.achievement_manager.record_game_result(self.board_size_enum, player_won)
 
                 all_win_condition, all_lose_condition = self.achievement_manager.check_special_event_conditions()
@@ -1306,7 +1214,7 @@ class GameWindow:
                     return
                 else:
                     if self.game_mode == GameMode.PVE and self.beauty_girl:
-                        if self.winner == Player.B:
+                        if self.state.winner == Player.B:
                             self.add_dialogue(self.beauty_girl.name, self.beauty_girl.get_dialogue('victory'))
                             self.beauty_girl.update_relationship(False)
                         else:
@@ -1316,13 +1224,17 @@ class GameWindow:
             self.show_game_over()
             return
 
-        self.current_player = Player.B if self.current_player == Player.A else Player.A
-        self.change_wind()
+        # 风向重新抽取时风子会有反应
+        if self.state.wind_duration == 1 and self.game_mode == GameMode.PVE and self.beauty_girl and self.state.current_player == Player.B:
+            self.add_dialogue(self.beauty_girl.name, self.beauty_girl.get_dialogue('wind_change'))
+
         self.update_display()
 
         # AI回合
-        if self.game_mode == GameMode.PVE and self.current_player == Player.B and not self.game_over:
-            self.root.after(1500, self.ai_move)
+        if self.game_mode == GameMode.PVE and self.state.current_player == Player.B and not self.state.game_over:
+            self.start_ai_thinking()
+        elif self.game_mode == GameMode.PVE and not self.state.game_over:
+            self.start_pondering()
 
     def _evaluate_move_quality(self, from_pos, to_pos, player):
         """评估移动质量"""
@@ -1339,76 +1251,146 @@ class GameWindow:
                 nx1, ny1 = to_x + dx, to_y + dy
                 nx2, ny2 = to_x - dx, to_y - dy
 
-                if 0 <= nx1 < self.board_size_value and 0 <= ny1 < self.board_size_value and self.board[ny1][nx1] == player:
+                if 0 <= nx1 < self.board_size_value and 0 <= ny1 < self.board_size_value and self.state.board[ny1][nx1] == player:
                     quality += 5
-                if 0 <= nx2 < self.board_size_value and 0 <= ny2 < self.board_size_value and self.board[ny2][nx2] == player:
+                if 0 <= nx2 < self.board_size_value and 0 <= ny2 < self.board_size_value and self.state.board[ny2][nx2] == player:
                     quality += 5
 
         return quality
 
-    def check_win(self, player):
-        """检查是否获胜"""
-        size = self.board_size_value
+    def start_ai_thinking(self):
+        """在后台线程中让AI思考，界面保持响应"""
+        self.stop_pondering()
+        self.cancel_ai()
+        self.ai_queue = queue.Queue()
+        self.ai_stop_event = threading.Event()
+        self.ai_start_time = time.time()
+        # 传给线程的是状态副本，界面线程和AI线程不共享可变对象
+        self.ai_thread = threading.Thread(
+            target=self._ai_worker,
+            args=(self.state.copy(), self.ai_queue, self.ai_stop_event),
+            daemon=True
+        )
+        self.ai_thread.start()
+        self.ai_poll_id = self.root.after(AI_POLL_INTERVAL, self.poll_ai_result)
 
-        for y in range(size):
-            for x in range(size - 2):
-                line = [(x+i, y) for i in range(3)]
-                if all(self.board[y][x+i] == player for i in range(3)):
-                    bottom_line = 0 if player == Player.A else size-1
-                    bottom_count = sum(1 for x, y in line if y == bottom_line)
-                    if bottom_count <= 1:
-                        return True
-
-        for x in range(size):
-            for y in range(size - 2):
-                line = [(x, y+i) for i in range(3)]
-                if all(self.board[y+i][x] == player for i in range(3)):
-                    bottom_line = 0 if player == Player.A else size-1
-                    bottom_count = sum(1 for x, y in line if y == bottom_line)
-                    if bottom_count <= 1:
-                        return True
-
-        for x in range(size - 2):
-            for y in range(size - 2):
-                line = [(x+i, y+i) for i in range(3)]
-                if all(self.board[y+i][x+i] == player for i in range(3)):
-                    bottom_line = 0 if player == Player.A else size-1
-                    bottom_count = sum(1 for x, y in line if y == bottom_line)
-                    if bottom_count <= 1:
-                        return True
-
-        for x in range(2, size):
-            for y in range(size - 2):
-                line = [(x-i, y+i) for i in range(3)]
-                if all(self.board[y+i][x-i] == player for i in range(3)):
-                    bottom_line = 0 if player == Player.A else size-1
-                    bottom_count = sum(1 for x, y in line if y == bottom_line)
-                    if bottom_count <= 1:
-                        return True
-
-        return False
-
-    def change_wind(self):
-        """改变风向"""
-        if self.wind_duration < self.max_wind_duration and random.random() < 0.7:
-            self.wind_duration += 1
+    def _ai_worker(self, state, result_queue, stop_event):
+        """AI线程：搜索完成后把(最佳移动, 是否命中后台思考, 错误信息)放入队列"""
+        try:
+            best_move = self.ai.find_best_move(state, stop_event=stop_event)
+        except Exception as e:
+            logger.exception("AI搜索出错")
+            result_queue.put((None, False, f"{type(e).__name__}: {e}"))
+            return
+        result_queue.put((best_move, self.ai.last_ponder_hit, None))
+
+    def poll_ai_result(self):
+        """定时检查AI线程的结果，只在界面线程中修改棋盘"""
+        self.ai_poll_id = None
+        if self.ai_stop_event is None or self.ai_stop_event.is_set():
+            return
+
+        if self.ai_result is None:
+            try:
+                self.ai_result = self.ai_queue.get_nowait()
+            except queue.Empty:
+                self.ai_poll_id = self.root.after(AI_POLL_INTERVAL, self.poll_ai_result)
+                return
+
+        best_move, ponder_hit, error = self.ai_result
+        delay = AI_PONDER_MOVE_DELAY if ponder_hit else AI_MOVE_DELAY
+        if error is None and (time.time() - self.ai_start_time) * 1000 < delay:
+            self.ai_poll_id = self.root.after(AI_POLL_INTERVAL, self.poll_ai_result)
+            return
+
+        self.ai_thread = None
+        self.ai_queue = None
+        self.ai_stop_event = None
+        self.ai_result = None
+        if error is not None:
+            self.handle_ai_error(error)
+            return
+        self.update_search_stats()
+        self.ai_move(best_move)
+
+    def handle_ai_error(self, error):
+        """AI线程出错时结束这次思考，让玩家选择重试或返回主菜单"""
+        self.add_dialogue("系统", f"AI思考时出错：{error}")
+        if messagebox.askretrycancel("AI出错", f"AI思考时出错：\n{error}\n\n重试，还是返回主菜单？"):
+            self.start_ai_thinking()
         else:
-            self.wind_direction = random.choice(list(WindDirection))
-            self.wind_duration = 1
-
-            if self.game_mode == GameMode.PVE and self.beauty_girl and self.current_player == Player.B:
-                self.add_dialogue(self.beauty_girl.name, self.beauty_girl.get_dialogue('wind_change'))
-
-    def ai_move(self):
-        """AI移动"""
-        game_state = {
-            "board": self.board,
-            "board_size": self.board_size_value,
-            "current_player": self.current_player,
-            "wind_direction": self.wind_direction
-        }
+            self.leave_game()
+
+    def cancel_ai(self):
+        """取消正在进行的AI思考"""
+        if self.ai_stop_event is not None:
+            self.ai_stop_event.set()
+        if self.ai_poll_id is not None:
+            try:
+                self.root.after_cancel(self.ai_poll_id)
+            except:
+                pass
+            self.ai_poll_id = None
+        if self.ai_thread is not None:
+            # 搜索定期检查停止标志，很快就会退出；必须等它退出，新的搜索才能使用同一个AI
+            self.ai_thread.join()
+        self.ai_thread = None
+        self.ai_queue = None
+        self.ai_stop_event = None
+        self.ai_result = None
+
+    def start_pondering(self):
+        """玩家思考时让AI在后台分析玩家可能的回应"""
+        self.stop_pondering()
+        self.ponder_stop_event = threading.Event()
+        self.ponder_thread = threading.Thread(
+            target=self._ponder_worker,
+            args=(self.state.copy(), self.ponder_stop_event),
+            daemon=True
+        )
+        self.ponder_thread.start()
 
-        best_move = self.ai.find_best_move(game_state)
+    def _ponder_worker(self, state, stop_event):
+        """后台思考线程，结果保存在AI的置换表中"""
+        try:
+            self.ai.ponder(state, stop_event)
+        except Exception:
+            logger.exception("后台思考出错")
+
+    def stop_pondering(self):
+        """停止后台思考，等线程退出后AI才能开始正式搜索
+
+        后台思考和正式搜索共用同一个AI（计数、杀手移动、置换表），
+        所以必须等线程真正退出；搜索每1024个节点检查一次停止标志，等待很短。
+        """
+        if self.ponder_stop_event is not None:
+            self.ponder_stop_event.set()
+        if self.ponder_thread is not None:
+            self.ponder_thread.join()
+        self.ponder_thread = None
+        self.ponder_stop_event = None
+
+    def update_search_stats(self):
+        """在调试面板中显示AI上一步的搜索统计"""
+        if self.search_stats_text is None:
+            return
+        self.search_stats_text.config(state=tk.NORMAL)
+        self.search_stats_text.delete("1.0", tk.END)
+        self.search_stats_text.insert(tk.END, self.ai.last_stats.summary())
+        self.search_stats_text.config(state=tk.DISABLED)
+
+    @watched()
+    def leave_game(self):
+        """返回主菜单前停止AI"""
+        self.stop_pondering()
+        self.cancel_ai()
+        if self.ai:
+            self.ai.close()
+        self.back_callback()
+
+    @watched()
+    def ai_move(self, best_move):
+        """AI移动（best_move由后台线程算出，没有可走的移动时为None）"""
         if best_move:
             from_pos, to_pos = best_move
             self.add_dialogue(self.beauty_girl.name, self.beauty_girl.get_dialogue('my_turn'))
@@ -1418,9 +1400,9 @@ class GameWindow:
 
     def update_display(self):
         """更新显示"""
-        current_player_text = "你(●)" if self.current_player == Player.A else f"{self.beauty_girl.name}(○)" if self.beauty_girl else "玩家B(○)"
+        current_player_text = "你(●)" if self.state.current_player == Player.A else f"{self.beauty_girl.name}(○)" if self.beauty_girl else "玩家B(○)"
 
-        info_text = f"回合: {self.move_count} | 棋盘: {self.board_name} | 风向: {self.wind_direction.value} ({self.wind_duration}/3) | 当前玩家: {current_player_text}"
+        info_text = f"回合: {self.state.move_count} | 棋盘: {self.board_name} | 风向: {self.state.wind_direction.value} ({self.state.wind_duration}/{self.state.max_wind_duration}) | 当前玩家: {current_player_text}"
         self.info_label.config(text=info_text)
 
         self.draw_board()
@@ -1434,11 +1416,11 @@ class GameWindow:
 
     def show_game_over(self):
         """显示游戏结束"""
-        winner_text = "🏆 恭喜！你获胜！" if self.winner == Player.A else "😢 遗憾！对手获胜！"
+        winner_text = "🏆 恭喜！你获胜！" if self.state.winner == Player.A else "😢 遗憾！对手获胜！"
 
         # 添加游戏结束信息
         self.add_dialogue("系统", f"游戏结束！{winner_text}")
-        self.add_dialogue("系统", f"总回合数: {self.move_count} | 棋盘: {self.board_name}")
+        self.add_dialogue("系统", f"总回合数: {self.state.move_count} | 棋盘: {self.board_name}")
 
         # 检查季节事件
         if self.game_mode == GameMode.PVE and random.random() < 0.3:
@@ -1718,6 +1700,7 @@ class ChatWindow:
         )
         self.next_topic_btn.pack(side=tk.LEFT, padx=10)
 
+    @watched()
     def start_new_topic(self):
         """开始新话题"""
         # 清空选项
@@ -1745,6 +1728,7 @@ class ChatWindow:
             )
             btn.pack(pady=3)
 
+    @watched()
     def handle_choice(self, response_text, favorability_change, reaction):
         """处理选择"""
         # 清空选项
@@ -1952,6 +1936,21 @@ class SettingsWindow:
             cursor="hand2"
         ).pack(side=tk.LEFT)
 
+        # AI搜索统计调试面板
+        stats_var = tk.BooleanVar(value=bool(self.achievement_manager.get_setting("show_search_stats")))
+
+        def save_stats_setting():
+            self.achievement_manager.update_setting("show_search_stats", stats_var.get())
+
+        tk.Checkbutton(
+            settings_frame,
+            text="对战时显示AI搜索统计（调试）",
+            variable=stats_var,
+            command=save_stats_setting,
+            font=("微软雅黑", 10),
+            bg="#f0f0f0"
+        ).pack(pady=5, padx=10, anchor=tk.W)
+
         # 查看制作人员名单
         tk.Button(
             settings_frame,
@@ -2049,7 +2048,12 @@ class SettingsWindow:
 
 def main():
     """主函数"""
+    # 每步AI搜索的统计写入轮换日志，便于分析思考过慢的问题
+    enable_search_log()
+    # 用 WIND_CHESS_PROFILE 或 --profile 开启时分析整个会话，退出时写出结果
+    start_session()
     root = tk.Tk()
+    start_watchdog(root)
     game = WindGameGUI(root)
     root.mainloop()
 
@@ -0,0 +1,363 @@
+import atexit
+import cProfile
+import functools
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+# 用环境变量或命令行参数开启性能分析，例如：
+#   WIND_CHESS_PROFILE=1 python wind_chess_gui.py
+#   python wind_chess_gui.py --profile=counters,sample
+# 可选的部分：counters（计时计数和直方图）、cprofile（界面线程的cProfile）、
+# sample（所有线程的调用栈采样，输出火焰图工具使用的折叠格式）、
+# watchdog（Tk事件循环的卡顿监测）；1/all表示全部
+PROFILE_ENV = "WIND_CHESS_PROFILE"
+PROFILE_FLAG = "--profile"
+PROFILE_PARTS = ("counters", "cprofile", "sample", "watchdog")
+
+# 输出文件的前缀：.txt计数报告、.prof为cProfile数据、.folded为折叠的调用栈
+PROFILE_OUTPUT = "wind_chess_profile"
+
+# 调用栈采样的间隔（秒）
+SAMPLE_INTERVAL = 0.005
+
+# 事件循环心跳的间隔，以及心跳延迟超过多少算一次卡顿（毫秒）
+WATCHDOG_INTERVAL_MS = 50
+WATCHDOG_STALL_MS = 100
+# 摘要中列出的最严重的卡顿数
+WATCHDOG_REPORT_STALLS = 10
+
+def _parse_parts(value: Optional[str]) -> frozenset:
+    """把开关的值解析为开启的部分"""
+    if value is None:
+        return frozenset()
+    value = value.strip().lower()
+    if value in ("", "1", "on", "true", "yes", "all"):
+        return frozenset(PROFILE_PARTS)
+    if value in ("0", "off", "false", "no"):
+        return frozenset()
+    return frozenset(part for part in value.split(",") if part in PROFILE_PARTS)
+
+def _is_parts_value(value: str) -> bool:
+    return bool(value) and all(part in PROFILE_PARTS + ("all",) for part in value.lower().split(","))
+
+def _parts_from_argv(argv) -> Optional[str]:
+    """命令行中的 --profile、--profile=部分 或 --profile 部分"""
+    for i, arg in enumerate(argv):
+        if arg == PROFILE_FLAG:
+            value = argv[i + 1] if i + 1 < len(argv) else ""
+            return value if _is_parts_value(value) else "all"
+        if arg.startswith(PROFILE_FLAG + "="):
+            return arg[len(PROFILE_FLAG) + 1:]
+    return None
+
+def strip_profile_args(argv) -> list:
+    """去掉命令行中的性能分析开关，其余参数交给程序自己解析"""
+    result = []
+    skip = False
+    for i, arg in enumerate(argv):
+        if skip:
+            skip = False
+            continue
+        if arg == PROFILE_FLAG:
+            skip = i + 1 < len(argv) and _is_parts_value(argv[i + 1])
+            continue
+        if arg.startswith(PROFILE_FLAG + "="):
+            continue
+        result.append(arg)
+    return result
+
+# 开关在导入时确定：被装饰的函数在定义时就决定是否包装
+PROFILE_PARTS_ENABLED = _parse_parts(_parts_from_argv(sys.argv[1:]) or os.environ.get(PROFILE_ENV))
+PROFILE_ENABLED = bool(PROFILE_PARTS_ENABLED)
+
+class ProfileCounter:
+    """一个函数的调用次数、总耗时、最长耗时和按2的幂分桶的耗时直方图（纳秒）
+
+    多个线程同时记录时不加锁，偶尔丢失一次计数，换取尽量小的开销。
+    """
+
+    __slots__ = ("name", "calls", "total_ns", "max_ns", "buckets")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        # 第i个桶记录耗时在[2^(i-1), 2^i)纳秒之间的调用
+        self.buckets = [0] * 64
+
+    def record(self, elapsed_ns: int):
+        self.calls += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        self.buckets[min(elapsed_ns.bit_length(), 63)] += 1
+
+    def percentile_ns(self, fraction: float) -> int:
+        """按直方图估计的分位数（所在桶的上界）"""
+        target = self.calls * fraction
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= target:
+                return 1 << i
+        return self.max_ns
+
+    def report(self) -> str:
+        """计数和直方图的文本形式"""
+        mean_ns = self.total_ns // self.calls if self.calls else 0
+        lines = [
+            f"{self.name}: {self.calls} 次  共 {self.total_ns / 1e6:.1f} 毫秒  平均 {mean_ns / 1e3:.1f} 微秒  "
+            f"p50 < {self.percentile_ns(0.5) / 1e3:.1f} 微秒  p99 < {self.percentile_ns(0.99) / 1e3:.1f} 微秒  "
+            f"最长 {self.max_ns / 1e3:.1f} 微秒"
+        ]
+        peak = max(self.buckets) or 1
+        for i, count in enumerate(self.buckets):
+            if count:
+                bar = "#" * max(1, count * 40 // peak)
+                lines.append(f"  < {(1 << i) / 1e3:>12.1f} 微秒 {count:>8} {bar}")
+        return "\n".join(lines)
+
+# 名称 -> 计数器
+COUNTERS: Dict[str, ProfileCounter] = {}
+
+def profiled(name: Optional[str] = None):
+    """为函数加上计时计数；未开启计数时原样返回函数，不增加任何开销"""
+    def decorate(func):
+        if "counters" not in PROFILE_PARTS_ENABLED:
+            return func
+        counter = COUNTERS.setdefault(name or func.__qualname__, ProfileCounter(name or func.__qualname__))
+        record = counter.record
+        clock = time.perf_counter_ns
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(clock() - start)
+        return wrapper
+    return decorate
+
+class EventLoopWatchdog:
+    """用after心跳测量Tk事件循环的延迟
+
+    心跳本应每interval_ms毫秒运行一次，实际晚到的时间就是事件循环被占用的时间。
+    延迟超过stall_ms时记为一次卡顿，归到上一次心跳以来耗时最长的界面回调
+    （用watched装饰的函数），没有记录到回调时记为“未标记”。
+    """
+
+    def __init__(self, root, interval_ms: int = WATCHDOG_INTERVAL_MS, stall_ms: int = WATCHDOG_STALL_MS):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.stall_ms = stall_ms
+        self.lags = ProfileCounter("事件循环延迟")
+        # 卡顿：(开始后的秒数, 延迟毫秒, 回调名)
+        self.stalls = []
+        self._start = 0.0
+        self._expected = 0.0
+        self._after_id = None
+        self._slowest_name = None
+        self._slowest_ns = 0
+
+    def start(self):
+        self._start = time.perf_counter()
+        self._schedule()
+
+    def stop(self):
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def _schedule(self):
+        self._expected = time.perf_counter() + self.interval_ms / 1000
+        self._after_id = self.root.after(self.interval_ms, self._beat)
+
+    def _beat(self):
+        now = time.perf_counter()
+        lag = max(0.0, now - self._expected)
+        self.lags.record(int(lag * 1e9))
+        if lag * 1000 >= self.stall_ms:
+            self.stalls.append((now - self._start, lag * 1000, self._slowest_name or "未标记"))
+        self._slowest_name = None
+        self._slowest_ns = 0
+        self._schedule()
+
+    def note_callback(self, name: str, elapsed_ns: int):
+        """记录一次界面回调的耗时，供下一次心跳归因"""
+        if elapsed_ns > self._slowest_ns:
+            self._slowest_ns = elapsed_ns
+            self._slowest_name = name
+
+    def summary(self) -> str:
+        """心跳延迟分布、按回调汇总的卡顿和最严重的几次卡顿"""
+        lines = [
+            f"事件循环：{self.lags.calls} 次心跳，卡顿（延迟 >= {self.stall_ms} 毫秒）{len(self.stalls)} 次",
+            self.lags.report()
+        ]
+        by_name = {}
+        for _, lag_ms, name in self.stalls:
+            count, total, worst = by_name.get(name, (0, 0.0, 0.0))
+            by_name[name] = (count + 1, total + lag_ms, max(worst, lag_ms))
+        for name, (count, total, worst) in sorted(by_name.items(), key=lambda item: item[1][1], reverse=True):
+            lines.append(f"  {name}: {count} 次  共 {total:.0f} 毫秒  最长 {worst:.0f} 毫秒")
+        worst_stalls = sorted(self.stalls, key=lambda stall: stall[1], reverse=True)[:WATCHDOG_REPORT_STALLS]
+        if worst_stalls:
+            lines.append("最严重的卡顿：")
+            for at, lag_ms, name in worst_stalls:
+                lines.append(f"  第 {at:.1f} 秒  {lag_ms:.0f} 毫秒  {name}")
+        return "\n".join(lines)
+
+# 正在运行的事件循环监测
+_watchdog = {"active": None}
+
+def watched(name: Optional[str] = None):
+    """标记Tk回调，卡顿时据此归因；未开启监测时原样返回函数"""
+    def decorate(func):
+        if "watchdog" not in PROFILE_PARTS_ENABLED:
+            return func
+        label = name or func.__name__
+        clock = time.perf_counter_ns
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                watchdog = _watchdog["active"]
+                if watchdog is not None:
+                    watchdog.note_callback(label, clock() - start)
+        return wrapper
+    return decorate
+
+def start_watchdog(root):
+    """在Tk根窗口上开始事件循环监测（未开启时什么也不做），摘要在会话结束时写出"""
+    if "watchdog" not in PROFILE_PARTS_ENABLED or _watchdog["active"] is not None:
+        return None
+    watchdog = EventLoopWatchdog(root)
+    watchdog.start()
+    _watchdog["active"] = watchdog
+    return watchdog
+
+class StackSampler:
+    """后台线程定时采样所有线程的调用栈，按折叠格式计数
+
+    折叠格式每行为“线程;模块:函数;...;模块:函数 次数”，
+    可直接交给flamegraph.pl或speedscope生成火焰图。
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+                    stack.append(f"{module}:{code.co_name}")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def write_folded(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+# 当前会话的cProfile和采样器
+_session = {"profiler": None, "sampler": None, "output": None}
+
+def start_session(output: str = PROFILE_OUTPUT):
+    """开始整个会话的分析（未开启时什么也不做），退出时自动写出结果"""
+    if not PROFILE_ENABLED or _session["output"] is not None:
+        return
+    _session["output"] = output
+    if "cprofile" in PROFILE_PARTS_ENABLED:
+        # cProfile只记录调用start_session的线程，一般是Tk界面线程
+        profiler = cProfile.Profile()
+        profiler.enable()
+        _session["profiler"] = profiler
+    if "sample" in PROFILE_PARTS_ENABLED:
+        sampler = StackSampler()
+        sampler.start()
+        _session["sampler"] = sampler
+    atexit.register(stop_session)
+
+def stop_session():
+    """结束会话分析并写出报告，返回写出的文件列表"""
+    output = _session["output"]
+    if output is None:
+        return []
+    _session["output"] = None
+    written = []
+
+    profiler = _session["profiler"]
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(output + ".prof")
+        written.append(output + ".prof")
+        _session["profiler"] = None
+
+    sampler = _session["sampler"]
+    if sampler is not None:
+        sampler.stop()
+        sampler.write_folded(output + ".folded")
+        written.append(output + ".folded")
+        _session["sampler"] = None
+
+    text = report()
+    watchdog = _watchdog["active"]
+    if watchdog is not None:
+        watchdog.stop()
+        text = "\n".join(part for part in (text, watchdog.summary()) if part)
+        _watchdog["active"] = None
+    if text:
+        with open(output + ".txt", "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        written.append(output + ".txt")
+        print(text, file=sys.stderr)
+
+    for path in written:
+        print(f"性能分析结果已写入 {path}", file=sys.stderr)
+    return written
+
+def report() -> str:
+    """所有计数器的报告，按总耗时从多到少排列"""
+    counters = sorted(COUNTERS.values(), key=lambda counter: counter.total_ns, reverse=True)
+    return "\n".join(counter.report() for counter in counters if counter.calls)
+
+def reset_counters():
+    """清空计数，例如在基准测试的两轮之间"""
+    for counter in COUNTERS.values():
+        counter.calls = 0
+        counter.total_ns = 0
+        counter.max_ns = 0
+        counter.buckets = [0] * 64